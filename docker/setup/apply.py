@@ -1,4 +1,6 @@
 from datetime import datetime
+from google.cloud import bigquery
+from materialize import write_snapshots
 from feature_store.repo import (
     config,
     features
@@ -34,4 +36,7 @@ if __name__ == '__main__':
     logging.info("Materializing features")
     store.materialize_incremental(datetime.now())
 
+    logging.info("Writing serving feature snapshots")
+    write_snapshots(logging, bigquery.Client(), store)
+
     logging.info("Done")
@@ -0,0 +1,136 @@
+import numpy as np
+import os
+import tempfile
+
+from datetime import datetime
+from google.cloud import bigquery
+from typing import Dict, List
+from feature_store.repo import (
+    config,
+    features
+)
+from feature_store.utils import (
+    DataFetcher,
+    RedisModelRepo,
+    TritonGCSModelRepo,
+    logger,
+    storage
+)
+
+
+def load_model(source: str):
+    """
+    Load the latest model version in process.
+
+    Args:
+        source (str): One of "gcs" (Triton model repo) or "redis" (Redis model repo).
+
+    Returns:
+        Tuple of the model object and its version.
+    """
+    if source == "gcs":
+        import xgboost
+
+        model_repo = TritonGCSModelRepo(
+            bucket_name=config.BUCKET_NAME,
+            model_name=config.MODEL_NAME,
+            model_filename=config.MODEL_FILENAME
+        )
+        local_path = os.path.join(tempfile.gettempdir(), config.MODEL_FILENAME)
+        model = xgboost.Booster()
+        model.load_model(model_repo.fetch_latest(local_path))
+        return model, model_repo.latest_version
+    if source == "redis":
+        model_repo = RedisModelRepo.from_config(config)
+        return model_repo.fetch_latest(), model_repo.latest_version
+    raise ValueError("'source' must be one of 'gcs' or 'redis'")
+
+def predict(model, X: np.ndarray) -> np.ndarray:
+    """
+    Score a feature matrix with an XGBoost Booster or scikit-learn style model.
+    """
+    if hasattr(model, "inplace_predict") and not hasattr(model, "get_booster"):
+        return model.inplace_predict(X)
+    return model.predict(X)
+
+def save_predictions(
+    redis_client,
+    states: List[str],
+    predictions: np.ndarray,
+    model_version: int
+):
+    """
+    Write all predictions back to Redis in a single round trip. Without
+    predictions, the previous ones are kept.
+
+    Args:
+        redis_client: Redis client.
+        states (List[str]): States the predictions belong to.
+        predictions (np.ndarray): Predictions in the same order as states.
+        model_version (int): Version of the model that made the predictions.
+    """
+    key = f"{config.PREDICTIONS_PREFIX}:{config.MODEL_NAME}"
+    mapping: Dict[str, float] = {
+        state: float(prediction) for state, prediction in zip(states, predictions)
+    }
+    if not mapping:
+        return
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping=mapping)
+    pipe.hset(f"{key}:meta", mapping={
+        "model_version": model_version,
+        "predicted_at": datetime.utcnow().isoformat()
+    })
+    pipe.execute()
+
+def batch_predict(logging):
+    """
+    Score the latest features of every state with the latest model and
+    store the predictions in Redis.
+    """
+    # Load FeatureStore
+    store = storage.get_feature_store(
+        config_path=config.REPO_CONFIG,
+        bucket_name=config.BUCKET_NAME
+    )
+    data_fetcher = DataFetcher(store)
+
+    logging.info("Fetching states")
+    client = bigquery.Client()
+    states = features.fetch_states(
+        client,
+        f"{config.PROJECT_ID}.{config.BIGQUERY_DATASET_NAME}.{config.WEEKLY_VACCINATIONS_TABLE}"
+    )
+    if not states:
+        logging.warning("No states to score, keeping the previous predictions")
+        return
+    entity_rows = [{"state": state} for state in states]
+
+    # One lookup for all states: a single pipelined online store read or a
+    # single point-in-time query against the offline store
+    logging.info(f"Fetching {config.BATCH_FEATURE_SOURCE} features for {len(states)} states")
+    if config.BATCH_FEATURE_SOURCE == "online":
+        X = data_fetcher.get_online_vectors(entity_rows)
+    elif config.BATCH_FEATURE_SOURCE == "offline":
+        X = data_fetcher.get_offline_vectors(entity_rows)
+    else:
+        raise ValueError("BATCH_FEATURE_SOURCE must be one of 'online' or 'offline'")
+
+    logging.info(f"Loading latest model from {config.BATCH_MODEL_SOURCE}")
+    model, model_version = load_model(config.BATCH_MODEL_SOURCE)
+
+    logging.info("Scoring")
+    predictions = predict(model, X)
+
+    logging.info("Saving predictions")
+    save_predictions(data_fetcher.redis_client, states, predictions, model_version)
+
+
+if __name__ == '__main__':
+    # Setup logger
+    logging = logger.get_logger()
+
+    batch_predict(logging)
+
+    logging.info("Done")
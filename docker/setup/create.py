@@ -32,7 +32,7 @@ if __name__ == "__main__":
 
     # Host the config in cloud storage
     logging.info("Uploading repo config to cloud storage bucket")
-    storage.upload_pkl(repo_config, config.BUCKET_NAME, config.REPO_CONFIG)
+    storage.upload_repo_config(repo_config, config.BUCKET_NAME, config.REPO_CONFIG)
 
     # Generate initial features data in offline store
     logging.info("Generating initial vaccine features in GCP")
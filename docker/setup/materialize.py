@@ -5,14 +5,45 @@ from feature_store.repo import (
     features
 )
 from feature_store.utils import (
+    DataFetcher,
     logger,
     storage
 )
+from feature_store.utils.feature_stats import FeatureStatsStore
 
-def materialize_features(logging):
+def write_snapshots(logging, client: bigquery.Client, store):
+    """
+    Write the precomputed serving feature vector of every state to Redis so
+    serving can skip the feature view join, and store point-in-time
+    per-feature statistics of the snapshot for this materialization window.
+    """
+    states = features.fetch_states(
+        client,
+        f"{config.PROJECT_ID}.{config.BIGQUERY_DATASET_NAME}.{config.WEEKLY_VACCINATIONS_TABLE}"
+    )
+    data_fetcher = DataFetcher(store)
+    vectors = data_fetcher.write_snapshot([{"state": state} for state in states])
+    logging.info(f"Wrote {len(vectors)} serving feature snapshots")
+
+    materialized_at = datetime.utcnow()
+    stats = FeatureStatsStore(
+        data_fetcher.redis_client,
+        store.project,
+        data_fetcher.serving_layout
+    ).write(
+        window=materialized_at.strftime("%Y-%m-%d"),
+        vectors=vectors,
+        materialized_at=materialized_at
+    )
+    if stats is None:
+        logging.info("Serving features unchanged, skipped feature statistics")
+    else:
+        logging.info("Wrote serving feature statistics")
+
+def materialize_features(logging, client: bigquery.Client):
     """
     Incrementally materialize ML features from offline store to online store
-    using Feast.
+    using Feast, then snapshot the latest serving feature vectors.
     """
     # Load FeatureStore
     store = storage.get_feature_store(
@@ -24,6 +55,10 @@ def materialize_features(logging):
     logging.info("Beginning materialization")
     store.materialize_incremental(end_date=datetime.now())
 
+    # Snapshot the joined serving vectors
+    logging.info("Writing serving feature snapshots")
+    write_snapshots(logging, client, store)
+
 def main(data, context):
     # Setup logger
     logging = logger.get_logger()
@@ -44,4 +79,4 @@ def main(data, context):
         f"{config.PROJECT_ID}.{config.BIGQUERY_DATASET_NAME}.{config.VACCINE_SEARCH_TRENDS_TABLE}"
     )
     # Perform local materialization
-    materialize_features(logging)
+    materialize_features(logging, client)
@@ -11,13 +11,25 @@ import triton_python_backend_utils as pb_utils
 from feature_store.repo import config
 from feature_store.utils import (
     DataFetcher,
+    cache,
     logger,
+    resilience,
+    shared_snapshot,
     storage
 )
 
 logging = logger.get_logger()
 
 
+def get_parameter(model_config: dict, key: str, default: str) -> str:
+    """
+    Read a string parameter from the model configuration.
+    """
+    parameter = model_config.get('parameters', {}).get(key)
+    if parameter and parameter.get('string_value'):
+        return parameter['string_value']
+    return default
+
 
 class TritonPythonModel:
     """Your Python model must use the same class name. Every Python model
@@ -44,21 +56,148 @@ class TritonPythonModel:
         # You must parse model_config. JSON string is not parsed here
         self.model_config = model_config = json.loads(args['model_config'])
 
+        # Feature service, entity inputs and output tensor served by this model
+        self.feature_service = get_parameter(
+            model_config, "FEATURE_SERVICE", DataFetcher.serving_feature_service)
+        self.output_name = get_parameter(
+            model_config, "OUTPUT_NAME", "feature_values")
+        entity_keys = get_parameter(model_config, "ENTITY_KEYS", "")
+        self.entity_keys = [key.strip() for key in entity_keys.split(",") if key.strip()]
+        self.use_snapshot = get_parameter(model_config, "USE_SNAPSHOT", "false").lower() == "true"
+
         # Get OUTPUT0 configuration
         output0_config = pb_utils.get_output_config_by_name(
-            model_config, "feature_values")
+            model_config, self.output_name)
 
         # Convert Triton types to numpy types
         self.output0_dtype = pb_utils.triton_string_to_numpy(
             output0_config['data_type'])
 
+        # The feature store (with its Redis connection pool and local registry
+        # copy) and the feature cache are shared by every model and feature
+        # service in this process
         logging.info("Loading feature store")
-        self.fs = storage.get_feature_store(
+        self.registry_cache = storage.get_shared_registry_cache(
             config_path=config.REPO_CONFIG,
-            bucket_name=config.BUCKET_NAME
+            bucket_name=config.BUCKET_NAME,
+            local_dir=config.REGISTRY_CACHE_DIR,
+            refresh_interval=config.REGISTRY_REFRESH_INTERVAL,
+            socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT
         )
-        logging.info("Loading feature store")
-        self.data_fetcher = DataFetcher(self.fs)
+        self.fs = self.registry_cache.store
+        # Timeouts, retries and circuit breaking for online store calls
+        retry_policy = resilience.RetryPolicy(
+            timeout=float(get_parameter(model_config, "FETCH_TIMEOUT_MS", "200")) / 1000,
+            max_retries=int(get_parameter(model_config, "FETCH_MAX_RETRIES", "2")),
+            backoff=float(get_parameter(model_config, "FETCH_BACKOFF_MS", "10")) / 1000,
+            max_backoff=float(get_parameter(model_config, "FETCH_MAX_BACKOFF_MS", "100")) / 1000,
+            breaker=resilience.CircuitBreaker(
+                failure_threshold=int(get_parameter(model_config, "BREAKER_FAILURE_THRESHOLD", "5")),
+                reset_timeout=float(get_parameter(model_config, "BREAKER_RESET_SECONDS", "10"))
+            )
+        )
+        logging.info("Loading data fetcher")
+        self.data_fetcher = DataFetcher(
+            self.fs,
+            feature_services=[self.feature_service],
+            cache=cache.get_shared_cache(
+                ttl=config.FEATURE_CACHE_TTL,
+                max_size=config.FEATURE_CACHE_SIZE
+            ),
+            registry_cache=self.registry_cache,
+            retry_policy=retry_policy
+        )
+        self.layout = self.data_fetcher.registry.get(self.feature_service)
+        if not self.entity_keys:
+            self.entity_keys = self.layout.join_keys
+
+        # The configured output width must match the feature service layout
+        output0_dims = [int(d) for d in output0_config['dims']]
+        if output0_dims != [self.layout.width]:
+            raise pb_utils.TritonModelException(
+                f"{self.output_name} dims {output0_dims} do not match the "
+                f"{self.layout.width} features in {self.feature_service}"
+            )
+
+        # Vector served when Redis is degraded and no stale vector is cached
+        default_vector = get_parameter(model_config, "DEFAULT_VECTOR", "")
+        if default_vector:
+            values = [0.0] * self.layout.width if default_vector == "zeros" \
+                else [float(v) for v in default_vector.split(",")]
+            if len(values) != self.layout.width:
+                raise pb_utils.TritonModelException(
+                    f"DEFAULT_VECTOR must have {self.layout.width} values"
+                )
+            self.data_fetcher.set_default_vector(self.feature_service, values)
+
+        # Instances on the host share one memory mapped snapshot, kept up
+        # to date by a single refresher process
+        shared_snapshot_path = get_parameter(model_config, "SHARED_SNAPSHOT_PATH", "")
+        if shared_snapshot_path and self.use_snapshot:
+            self.snapshot_refresher = shared_snapshot.SharedSnapshotRefresher(
+                path=shared_snapshot_path,
+                version=lambda: self.data_fetcher.get_snapshot_version(self.feature_service),
+                load=lambda: self.data_fetcher.read_snapshot(self.feature_service),
+                interval=float(get_parameter(model_config, "SHARED_SNAPSHOT_REFRESH_SECONDS", "60"))
+            )
+            self.snapshot_refresher.start()
+            self.data_fetcher.set_shared_snapshot(
+                self.feature_service,
+                shared_snapshot.SharedSnapshot(shared_snapshot_path)
+            )
+
+        # Triton only reports the model as ready once initialize returns,
+        # so warm up here to keep cold instances out of rotation
+        self._warm_up(model_config)
+
+    def _warm_up(self, model_config: dict):
+        """
+        Load the registry, open pooled Redis connections and preload the
+        feature vectors of the configured warm up entities, from the snapshot
+        when serving from it.
+        """
+        connections = int(get_parameter(model_config, "WARMUP_CONNECTIONS", "1"))
+        entities = get_parameter(model_config, "WARMUP_ENTITIES", "")
+        ttl = float(get_parameter(model_config, "WARMUP_TTL_SECONDS", "3600"))
+        entity_rows = []
+        if entities == "*":
+            # Every entity of the latest materialized snapshot
+            entity_rows = self.data_fetcher.get_snapshot_entities(self.feature_service)
+        elif entities:
+            if len(self.entity_keys) != 1:
+                raise pb_utils.TritonModelException(
+                    "WARMUP_ENTITIES requires exactly one entity key"
+                )
+            entity_rows = [
+                {self.entity_keys[0]: value.strip()}
+                for value in entities.split(",") if value.strip()
+            ]
+        logging.info(f"Warming up {self.feature_service}")
+        try:
+            summary = self.data_fetcher.warm_up(
+                connections=connections,
+                entity_rows=entity_rows,
+                feature_service=self.feature_service,
+                use_snapshot=self.use_snapshot,
+                ttl=ttl
+            )
+        except Exception as why:
+            raise pb_utils.TritonModelException(f"Warm up failed: {why}")
+        logging.info(f"Warm up complete: {summary}")
+
+    def _entity_rows(self, request) -> list:
+        """
+        Build one Feast entity row per batch item of a request.
+        """
+        columns = []
+        for key in self.entity_keys:
+            values = pb_utils.get_input_tensor_by_name(request, key).as_numpy().reshape(-1)
+            columns.append([
+                v.decode('utf-8') if isinstance(v, bytes) else v.item()
+                for v in values
+            ])
+        return [dict(zip(self.entity_keys, row)) for row in zip(*columns)]
 
     def execute(self, requests):
         """`execute` MUST be implemented in every Python model. `execute`
@@ -86,24 +225,43 @@ class TritonPythonModel:
 
         responses = []
 
-        # Every Python backend must iterate over everyone of the requests
-        # and create a pb_utils.InferenceResponse for each of them.
+        # Gather the entities of every request so features for the whole
+        # batch are fetched in a single online store lookup
+        entity_rows, offsets = [], [0]
         for request in requests:
-            # Get Input
-            input_tensor = pb_utils.get_input_tensor_by_name(request, "state")
-            state = input_tensor.as_numpy().reshape(1)
-            logging.info(state)
+            entity_rows.extend(self._entity_rows(request))
+            offsets.append(len(entity_rows))
+        logging.info(entity_rows)
 
-            # Fetch feature data from Feast db
-            feature_vector = self.data_fetcher.get_online_data(state=state[0].decode('utf-8'))
-            feature_out = feature_vector.to_numpy().reshape(-1, 8)
-            logging.info(feature_vector)
+        # Fetch feature data from the precomputed snapshot or Feast db
+        fetch = self.data_fetcher.get_snapshot_vectors if self.use_snapshot \
+            else self.data_fetcher.get_online_vectors
+        failed = set()
+        try:
+            feature_out = fetch(
+                entity_rows,
+                feature_service=self.feature_service
+            )
+        except resilience.FeatureFetchError as why:
+            # Only the requests with unserved entities fail
+            logging.warning(why)
+            feature_out, failed = why.vectors, set(why.failed)
+        feature_out = feature_out.astype(output0_dtype, copy=False)
 
+        # Every Python backend must iterate over everyone of the requests
+        # and create a pb_utils.InferenceResponse for each of them.
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            if failed.intersection(range(start, end)):
+                responses.append(pb_utils.InferenceResponse(
+                    output_tensors=[],
+                    error=pb_utils.TritonError("Features unavailable for this request")
+                ))
+                continue
             # Create InferenceResponse
             inference_response = pb_utils.InferenceResponse(
                 output_tensors=[pb_utils.Tensor(
-                    "feature_values",
-                    feature_out.astype(output0_dtype)
+                    self.output_name,
+                    feature_out[start:end]
                 )]
             )
             responses.append(inference_response)
@@ -116,4 +274,4 @@ class TritonPythonModel:
         Implementing `finalize` function is OPTIONAL. This function allows
         the model to perform any necessary clean ups before exit.
         """
-        logging.info('Cleaning up...')
\ No newline at end of file
+        logging.info('Cleaning up...')
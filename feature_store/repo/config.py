@@ -4,13 +4,24 @@ PROJECT_ID = os.environ["PROJECT_ID"]
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 REDIS_CONNECTION_STRING = os.getenv("REDIS_CONNECTION_STRING", "localhost:6379")
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "0.5"))
 BUCKET_NAME = os.getenv("BUCKET_NAME", "gcp-feast-demo")
 GCP_REGION = os.getenv("GCP_REGION", "us-east1")
 FEAST_PROJECT = os.getenv("FEAST_PROJECT", "feature_store")
-REPO_CONFIG = "data/repo_config.pkl"
+REPO_CONFIG = "data/repo_config.json"
+REGISTRY_CACHE_DIR = os.getenv("REGISTRY_CACHE_DIR", "/tmp/feast_registry")
+REGISTRY_REFRESH_INTERVAL = float(os.getenv("REGISTRY_REFRESH_INTERVAL", "60"))
 BIGQUERY_DATASET_NAME = "gcp_feast_demo"
 MODEL_NAME = "predict-vaccine-counts"
 MODEL_FILENAME = "xgboost.json"
+MODEL_SERIALIZER = os.getenv("MODEL_SERIALIZER", "xgboost_ubj")
 VACCINE_SEARCH_TRENDS_TABLE = "vaccine_search_trends"
 WEEKLY_VACCINATIONS_TABLE = "us_weekly_vaccinations"
 DAILY_VACCINATIONS_CSV_URL = "https://raw.githubusercontent.com/owid/covid-19-data/master/public/data/vaccinations/us_state_vaccinations.csv"
+FEATURE_CACHE_TTL = float(os.getenv("FEATURE_CACHE_TTL", "60"))
+FEATURE_CACHE_SIZE = int(os.getenv("FEATURE_CACHE_SIZE", "10000"))
+BATCH_FEATURE_SOURCE = os.getenv("BATCH_FEATURE_SOURCE", "online")
+BATCH_MODEL_SOURCE = os.getenv("BATCH_MODEL_SOURCE", "gcs")
+PREDICTIONS_PREFIX = "predictions"
+AUDIT_RETENTION = os.getenv("AUDIT_RETENTION", "false").lower() == "true"
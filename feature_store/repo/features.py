@@ -2,7 +2,9 @@ import pandas as pd
 import tempfile
 
 from datetime import timedelta
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
+from typing import List
 from feast import (
     BigQuerySource,
     Entity,
@@ -104,6 +106,84 @@ training_features = FeatureService(
 )
 
 
+# Feature tables are partitioned by event date and clustered by entity so
+# historical retrieval and materialization queries only scan what they need
+PARTITION_FIELD = "date"
+CLUSTERING_FIELDS = ["state"]
+
+
+def time_partitioning() -> bigquery.TimePartitioning:
+    return bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field=PARTITION_FIELD
+    )
+
+def ensure_partitioned(
+    logging,
+    client: bigquery.Client,
+    table_id: str
+):
+    """
+    Repartition a feature table that exists without the expected partitioning
+    and clustering, since a truncating write cannot change either. The table
+    is replaced in place from its own rows, so readers never see it missing
+    and it is left intact if the repartitioning or a later write fails.
+
+    Args:
+        client (bigquery.Client): GCP bigquery Client.
+        table_id (str): Table ID for the feature set.
+    """
+    try:
+        table = client.get_table(table_id)
+    except NotFound:
+        return
+    partitioning = table.time_partitioning
+    if partitioning is None or partitioning.field != PARTITION_FIELD \
+            or table.clustering_fields != CLUSTERING_FIELDS:
+        logging.info(f"Repartitioning {table_id} with partitioning and clustering")
+        client.query(repartition_sql(table_id)).result()
+
+def repartition_sql(table_id: str) -> str:
+    """
+    SQL atomically replacing a feature table with a copy partitioned by day
+    on the event timestamp and clustered by entity.
+
+    Args:
+        table_id (str): Table ID for the feature set.
+    """
+    return f"""
+        CREATE OR REPLACE TABLE `{table_id}`
+        PARTITION BY DATE({PARTITION_FIELD})
+        CLUSTER BY {", ".join(CLUSTERING_FIELDS)}
+        AS SELECT * FROM `{table_id}`
+    """
+
+def fetch_states(
+    client: bigquery.Client,
+    table_id: str
+) -> List[str]:
+    """
+    Fetch every state (entity value) present in a feature table.
+
+    Args:
+        client (bigquery.Client): GCP bigquery Client.
+        table_id (str): Table ID for the feature set.
+
+    Returns:
+        List[str]: Sorted state names.
+    """
+    sql = f"""
+        SELECT DISTINCT
+            state
+        FROM
+            `{table_id}`
+        WHERE
+            state IS NOT NULL
+        ORDER BY
+            state
+    """
+    return [row.state for row in client.query(sql).result()]
+
 def generate_vaccine_search_trends(
     logging,
     client: bigquery.Client,
@@ -117,11 +197,35 @@ def generate_vaccine_search_trends(
         client (bigquery.Client): GCP bigquery Client.
         table_id (str): Table ID for this feature set.
     """
-    job_config = bigquery.QueryJobConfig(
+    ensure_partitioned(logging, client, table_id)
+    query_job = client.query(
+        vaccine_search_trends_sql(),
+        job_config=vaccine_search_trends_job_config(table_id)
+    )
+    query_job.result()
+    logging.info("Generated weekly vaccine search trends features")
+
+def vaccine_search_trends_job_config(table_id: str) -> bigquery.QueryJobConfig:
+    """
+    Query job config writing the vaccine search trends features to a
+    partitioned and clustered table.
+
+    Args:
+        table_id (str): Table ID for this feature set.
+    """
+    return bigquery.QueryJobConfig(
         destination=table_id,
-        write_disposition='WRITE_TRUNCATE'
+        write_disposition='WRITE_TRUNCATE',
+        time_partitioning=time_partitioning(),
+        clustering_fields=CLUSTERING_FIELDS
     )
-    sql = f"""
+
+def vaccine_search_trends_sql() -> str:
+    """
+    SQL deriving weekly vaccine search trends features from the public
+    Google dataset.
+    """
+    return """
     WITH vaccine_trends AS (
             SELECT
                 date,
@@ -173,21 +277,24 @@ def generate_vaccine_search_trends(
             date ASC,
             state;
     """
-    query_job = client.query(sql, job_config=job_config)
-    query_job.result()
-    logging.info("Generated weekly vaccine search trends features")
 
 def generate_vaccine_counts(
     logging,
     client: bigquery.Client,
-    table_id: str
+    table_id: str,
+    audit_retention: bool = config.AUDIT_RETENTION
 ):
     """
     Generate and upload vaccine count features from a CSV to BigQuery.
 
+    By default the transformed DataFrame is loaded straight from memory as
+    Parquet. With audit retention, it is staged as a CSV in GCS and loaded
+    from there, keeping a copy of exactly what was loaded.
+
     Args:
         client (bigquery.Client): GCP bigquery Client.
         table_id (str): Table ID for this feature set.
+        audit_retention (bool, optional): Stage the features CSV in GCS. Defaults to config.AUDIT_RETENTION.
     """
     # Generate temp dir
     tmpdir = tempfile.gettempdir()
@@ -226,6 +333,20 @@ def generate_vaccine_counts(
     df['weekly_vaccinations_count'] = df['weekly_vaccinations_count'].astype('Int64', errors='ignore')
     df['lag_1_weekly_vaccinations_count'] = df['lag_1_weekly_vaccinations_count'].astype('Int64', errors='ignore')
     df['lag_2_weekly_vaccinations_count'] = df['lag_2_weekly_vaccinations_count'].astype('Int64', errors='ignore')
+    ensure_partitioned(logging, client, table_id)
+
+    if not audit_retention:
+        logging.info("Loading dataframe")
+        load_job = client.load_table_from_dataframe(
+            df,
+            table_id,
+            job_config=vaccine_counts_job_config(bigquery.SourceFormat.PARQUET)
+        )
+        # Wait for job to complete
+        load_job.result()
+        logging.info("Generated weekly vaccine count features")
+        return
+
     df['date'] = df['date'].dt.strftime("%Y-%m-%d %H:%M:%S")
 
     logging.info("Uploading CSV")
@@ -239,7 +360,27 @@ def generate_vaccine_counts(
         bucket_name=config.BUCKET_NAME
     )
 
-    # Load bq job config
+    # Start the job
+    logging.info("Running query")
+    load_job = client.load_table_from_uri(
+        f"gs://{config.BUCKET_NAME}/{output_storage_filename}",
+        table_id,
+        job_config=vaccine_counts_job_config()
+    )
+    # Wait for job to complete
+    load_job.result()
+    logging.info("Generated weekly vaccine count features")
+
+def vaccine_counts_job_config(
+    source_format: str = bigquery.SourceFormat.CSV
+) -> bigquery.LoadJobConfig:
+    """
+    Load job config writing the weekly vaccine count features to a
+    partitioned and clustered table.
+
+    Args:
+        source_format (str, optional): CSV for the staged file or PARQUET for an in-memory DataFrame. Defaults to CSV.
+    """
     job_config = bigquery.LoadJobConfig(
         schema=[
             bigquery.SchemaField("date", "TIMESTAMP"),
@@ -248,18 +389,12 @@ def generate_vaccine_counts(
             bigquery.SchemaField("weekly_vaccinations_count", "INTEGER"),
             bigquery.SchemaField("lag_2_weekly_vaccinations_count", "INTEGER")
         ],
-        skip_leading_rows=1,
-        max_bad_records=2,
-        source_format=bigquery.SourceFormat.CSV,
-        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE
+        source_format=source_format,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        time_partitioning=time_partitioning(),
+        clustering_fields=CLUSTERING_FIELDS
     )
-    # Start the job
-    logging.info("Running query")
-    load_job = client.load_table_from_uri(
-        f"gs://{config.BUCKET_NAME}/{output_storage_filename}",
-        table_id,
-        job_config=job_config
-    )
-    # Wait for job to complete
-    load_job.result()
-    logging.info("Generated weekly vaccine count features")
\ No newline at end of file
+    if source_format == bigquery.SourceFormat.CSV:
+        job_config.skip_leading_rows = 1
+        job_config.max_bad_records = 2
+    return job_config
@@ -1,3 +1,4 @@
 from .data_fetcher import DataFetcher
+from .feature_registry import FeatureLayout, FeatureRegistry
 from .triton_model_repo import TritonGCSModelRepo
 from .redis_model_repo import RedisModelRepo
\ No newline at end of file
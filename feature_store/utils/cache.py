@@ -0,0 +1,110 @@
+import threading
+import time
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+
+class FeatureCache:
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int
+    ):
+        """
+        FeatureCache is a thread-safe, size bounded LRU cache of feature vectors
+        with a time-to-live on each entry.
+
+        Args:
+            ttl (float): Seconds an entry stays fresh. A ttl of 0 disables the cache.
+            max_size (int): Maximum number of entries to hold.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """
+        Fetch a fresh entry from the cache.
+
+        Args:
+            key (Hashable): Cache key.
+            allow_stale (bool, optional): Return expired entries that were not evicted yet. Defaults to False.
+
+        Returns:
+            Any: Cached value or None when missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic() and not allow_stale:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store an entry in the cache, evicting the least recently used
+        entry when full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+            ttl (float, optional): Seconds the entry stays fresh. Defaults to the cache ttl.
+        """
+        self.set_many([(key, value)], ttl=ttl)
+
+    def set_many(
+        self,
+        items: Iterable[Tuple[Hashable, Any]],
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Store many entries in the cache under a single lock, evicting the
+        least recently used entries when full.
+
+        Args:
+            items (Iterable[Tuple[Hashable, Any]]): Cache key and value pairs.
+            ttl (float, optional): Seconds the entries stay fresh. Defaults to the cache ttl.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            for key, value in items:
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache(maxsize=None)
+def get_shared_cache(ttl: float, max_size: int) -> FeatureCache:
+    """
+    Fetch the process-wide FeatureCache so every model instance and
+    feature service in this process shares one cache.
+
+    Args:
+        ttl (float): Seconds an entry stays fresh.
+        max_size (int): Maximum number of entries to hold.
+
+    Returns:
+        FeatureCache: Shared feature cache.
+    """
+    return FeatureCache(ttl=ttl, max_size=max_size)
@@ -1,34 +1,529 @@
+import numpy as np
 import pandas as pd
 
-from feast import FeatureStore
-from typing import Optional
+from datetime import datetime
+from feast import FeatureService, FeatureStore
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+from .cache import FeatureCache
+from .feature_registry import FeatureLayout, FeatureRegistry
+from .logger import get_logger
+from .registry_cache import RegistryCache
+from .resilience import FeatureFetchError, RetryPolicy
+from .shared_snapshot import SharedSnapshot
+from . import snapshot
 
 
-class DataFetcher:
-    X_cols = [
-        'lag_1_vaccine_interest',
-        'lag_2_vaccine_interest',
-        'lag_1_vaccine_intent',
-        'lag_2_vaccine_intent',
-        'lag_1_vaccine_safety',
-        'lag_2_vaccine_safety',
-        'lag_1_weekly_vaccinations_count',
-        'lag_2_weekly_vaccinations_count'
-    ]
+logging = get_logger()
+
 
-    y_col = ['weekly_vaccinations_count']
+class DataFetcher:
+    serving_feature_service = "serving_features"
+    training_feature_service = "training_features"
 
-    def __init__(self, fs: FeatureStore):
+    def __init__(
+        self,
+        fs: FeatureStore,
+        feature_services: Optional[List[str]] = None,
+        cache: Optional[FeatureCache] = None,
+        registry_cache: Optional[RegistryCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        default_vectors: Optional[Dict[str, np.ndarray]] = None
+    ):
         """
         DataFetcher is a generic helper class to abstract the fetching of
         data from the offline and online ML feature sources a la Feast.
 
         Args:
             fs (FeatureStore): Feast FeatureStore object.
+            feature_services (List[str], optional): Feature services to resolve upfront; others are resolved on first use. Defaults to None.
+            cache (FeatureCache, optional): Cache of online feature vectors. Defaults to None.
+            registry_cache (RegistryCache, optional): Local registry lookups to resolve feature services from. Defaults to None.
+            retry_policy (RetryPolicy, optional): Timeout, retry and circuit breaker policy for online store calls. Defaults to None.
+            default_vectors (Dict[str, np.ndarray], optional): Vector served per feature service when the online store is degraded and no stale vector is cached. Defaults to None.
         """
         self._fs = fs
-        self.serving_feature_svc = self._fs.get_feature_service("serving_features")
-        self.training_feature_svc = self._fs.get_feature_service("training_features")
+        self._cache = cache
+        self._retry_policy = retry_policy
+        self._default_vectors = default_vectors or {}
+        self._shared_snapshots = {}
+        # Resolve definitions from the precomputed registry lookups if available,
+        # else from the Feast cached registry rather than re-reading it per lookup
+        self._lookup = registry_cache or self._fs
+        if registry_cache is not None:
+            self._get_feature_service = registry_cache.get_feature_service
+        else:
+            self._get_feature_service = partial(self._fs.get_feature_service, allow_cache=True)
+        # Column order, dtypes and widths are derived once per feature service;
+        # the serving and training defaults are only resolved when first used
+        names = list(dict.fromkeys(feature_services or []))
+        self._feature_svcs = {name: self._get_feature_service(name) for name in names}
+        self.registry = FeatureRegistry.from_feature_store(self._lookup, names)
+
+    def _layout(self, name: str) -> FeatureLayout:
+        """
+        Layout of a feature service, resolving and registering it on first use.
+        """
+        if name not in self.registry:
+            self._feature_svcs[name] = self._get_feature_service(name)
+            self.registry.add(
+                FeatureRegistry.from_feature_store(self._lookup, [name]).get(name)
+            )
+        return self.registry.get(name)
+
+    def _feature_service(self, name: str) -> FeatureService:
+        """
+        Definition of a feature service, resolving it on first use.
+        """
+        self._layout(name)
+        return self._feature_svcs[name]
+
+    @property
+    def serving_feature_svc(self) -> FeatureService:
+        return self._feature_service(self.serving_feature_service)
+
+    @property
+    def training_feature_svc(self) -> FeatureService:
+        return self._feature_service(self.training_feature_service)
+
+    @property
+    def serving_layout(self) -> FeatureLayout:
+        return self._layout(self.serving_feature_service)
+
+    @property
+    def training_layout(self) -> FeatureLayout:
+        return self._layout(self.training_feature_service)
+
+    @property
+    def X_cols(self) -> List[str]:
+        return self.serving_layout.columns
+
+    @property
+    def y_col(self) -> List[str]:
+        return self.training_layout.difference(self.serving_layout)
+
+    def get_online_vectors(
+        self,
+        entity_rows: List[Dict],
+        feature_service: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Fetch ML Features from the online data source as a float32 matrix
+        in feature service layout order. Cached vectors are reused and all
+        misses are fetched in a single online store lookup.
+
+        If the lookup fails under the retry policy, rows are served from stale
+        cached vectors or the feature service default vector instead.
+
+        Args:
+            entity_rows (List[Dict]): Entity key/value mappings, one per feature vector.
+            feature_service (str, optional): Name of the feature service. Defaults to the serving features.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(entity_rows), layout width).
+
+        Raises:
+            FeatureFetchError: If some rows could not be served. The error holds
+                the indices of those rows and the partially filled matrix.
+        """
+        name = feature_service or self.serving_feature_service
+        layout = self._layout(name)
+        out = np.empty((len(entity_rows), layout.width), dtype=np.float32)
+
+        misses = []
+        for i, entity_row in enumerate(entity_rows):
+            vector = self._cache.get(self._cache_key(name, entity_row)) if self._cache is not None else None
+            if vector is None:
+                misses.append(i)
+            else:
+                out[i] = vector
+
+        if misses:
+            try:
+                features = self._call(
+                    self._fs.get_online_features,
+                    features=self._feature_service(name),
+                    entity_rows=[entity_rows[i] for i in misses]
+                ).to_dict()
+            except FeatureFetchError as why:
+                logging.warning(f"Serving fallback vectors for {name}: {why}")
+                self._fill_fallbacks(name, entity_rows, misses, out)
+                return out
+            out[misses] = layout.assemble(features)
+            self._cache_vectors(name, [entity_rows[i] for i in misses], out[misses])
+        return out
+
+    def _cache_vectors(
+        self,
+        feature_service: str,
+        entity_rows: List[Dict],
+        vectors: np.ndarray,
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Keep a copy of each fetched vector in the cache, fresh for the cache TTL
+        (or the given ttl) and as a stale fallback for when the online store
+        is degraded.
+        """
+        if self._cache is not None:
+            self._cache.set_many(
+                (
+                    (self._cache_key(feature_service, entity_row), vector.copy())
+                    for entity_row, vector in zip(entity_rows, vectors)
+                ),
+                ttl=ttl
+            )
+
+    def set_default_vector(self, feature_service: str, values: List[float]) -> None:
+        """
+        Set the vector served for a feature service when the online store is
+        degraded and no stale vector is cached.
+
+        Args:
+            feature_service (str): Name of the feature service.
+            values (List[float]): Feature values in layout order.
+        """
+        vector = np.asarray(values, dtype=np.float32)
+        if vector.shape != (self._layout(feature_service).width,):
+            raise ValueError(f"Default vector does not match the {feature_service} layout")
+        self._default_vectors[feature_service] = vector
+
+    def _call(self, fn, *args, **kwargs):
+        """
+        Call the online store under the retry policy, if any.
+        """
+        if self._retry_policy is None:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as why:
+                raise FeatureFetchError(f"Online store call failed: {why}")
+        return self._retry_policy.call(fn, *args, **kwargs)
+
+    def _fill_fallbacks(
+        self,
+        feature_service: str,
+        entity_rows: List[Dict],
+        rows: List[int],
+        out: np.ndarray
+    ) -> None:
+        """
+        Fill rows from stale cached vectors or the default vector, raising
+        FeatureFetchError for the rows that have neither.
+        """
+        default = self._default_vectors.get(feature_service)
+        failed = []
+        for i in rows:
+            vector = None
+            if self._cache is not None:
+                vector = self._cache.get(
+                    self._cache_key(feature_service, entity_rows[i]),
+                    allow_stale=True
+                )
+            if vector is None:
+                vector = default
+            if vector is None:
+                failed.append(i)
+            else:
+                out[i] = vector
+        if failed:
+            error = FeatureFetchError(
+                f"No features available for {len(failed)} entities of {feature_service}",
+                failed=failed
+            )
+            error.vectors = out
+            raise error
+
+    def get_offline_vectors(
+        self,
+        entity_rows: List[Dict],
+        feature_service: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Fetch the latest ML Features for many entities from the offline data
+        source in one point-in-time query, as a float32 matrix in feature
+        service layout order.
+
+        Args:
+            entity_rows (List[Dict]): Entity key/value mappings, one per feature vector.
+            feature_service (str, optional): Name of the feature service. Defaults to the serving features.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(entity_rows), layout width).
+        """
+        name = feature_service or self.serving_feature_service
+        layout = self._layout(name)
+        entity_df = pd.DataFrame(entity_rows)
+        entity_df["event_timestamp"] = pd.Timestamp.now(tz="UTC")
+        features = self._fs.get_historical_features(
+            features=self._feature_service(name),
+            entity_df=entity_df
+        ).to_df()
+        # Historical retrieval does not preserve row order
+        keys = list(entity_df.columns.drop("event_timestamp"))
+        features = entity_df[keys].merge(features, on=keys, how="left")
+        return layout.assemble(features)
+
+    @property
+    def redis_client(self):
+        """
+        Redis client (and connection pool) of the Feast online store.
+        """
+        provider = self._fs._get_provider()
+        return provider.online_store._get_client(self._fs.config.online_store)
+
+    def warm_up(
+        self,
+        connections: int = 1,
+        entity_rows: Optional[List[Dict]] = None,
+        feature_service: Optional[str] = None,
+        use_snapshot: bool = False,
+        ttl: Optional[float] = None
+    ) -> dict:
+        """
+        Pay the cold start costs up front: load the Feast registry, open
+        pooled Redis connections and, optionally, preload feature vectors
+        through the same path that serves them.
+
+        Args:
+            connections (int, optional): Number of pooled Redis connections to open. Defaults to 1.
+            entity_rows (List[Dict], optional): Entities to preload into the cache. Defaults to None.
+            feature_service (str, optional): Name of the feature service to preload. Defaults to the serving features.
+            use_snapshot (bool, optional): Preload from the precomputed snapshot (shared or in Redis) rather than the online store. Defaults to False.
+            ttl (float, optional): Seconds preloaded vectors stay fresh in the cache. Defaults to the cache TTL.
+
+        Returns:
+            dict: Summary of the warm up.
+        """
+        self._fs.refresh_registry()
+
+        client = self.redis_client
+        client.ping()
+        pool = getattr(client, "connection_pool", None)
+        if pool is not None:
+            # Check out several connections at once so each one is opened,
+            # then hand them back to the pool for serving
+            opened = [pool.get_connection("PING") for _ in range(connections)]
+            for connection in opened:
+                pool.release(connection)
+
+        preloaded = 0
+        if entity_rows:
+            name = feature_service or self.serving_feature_service
+            fetch = self.get_snapshot_vectors if use_snapshot else self.get_online_vectors
+            vectors = fetch(entity_rows, name)
+            self._cache_vectors(name, entity_rows, vectors, ttl=ttl)
+            preloaded = len(vectors)
+        return {"connections": connections, "preloaded": preloaded}
+
+    def write_snapshot(
+        self,
+        entity_rows: List[Dict],
+        feature_service: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Precompute the joined feature vector of every entity from the online
+        store and write it to Redis as one packed float32 value per entity.
+        Run after each materialization.
+
+        Args:
+            entity_rows (List[Dict]): Entities to snapshot.
+            feature_service (str, optional): Name of the feature service. Defaults to the serving features.
+
+        Returns:
+            np.ndarray: The vectors written, in entity_rows order.
+        """
+        name = feature_service or self.serving_feature_service
+        features = self._fs.get_online_features(
+            features=self._feature_service(name),
+            entity_rows=entity_rows
+        ).to_dict()
+        layout = self._layout(name)
+        vectors = layout.assemble(features)
+        snapshot.write_snapshot(
+            self.redis_client,
+            self._fs.project,
+            layout,
+            entity_rows,
+            vectors
+        )
+        return vectors
+
+    def get_snapshot_vector(self, **entities) -> Optional[np.ndarray]:
+        """
+        Fetch the precomputed serving feature vector of one entity with a
+        single GET. The returned array is a read-only view of the Redis value.
+
+        Returns:
+            np.ndarray: Feature vector in serving layout order, or None if missing.
+        """
+        layout = self.serving_layout
+        value = self.redis_client.get(snapshot.snapshot_key(
+            self._fs.project,
+            layout.name,
+            snapshot.entity_id(entities, layout.join_keys)
+        ))
+        if value is not None:
+            return snapshot.decode_vector(value, layout.width)
+
+    def get_snapshot_vectors(
+        self,
+        entity_rows: List[Dict],
+        feature_service: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Fetch precomputed feature vectors for many entities from the shared
+        memory snapshot, if one is set, else with a single MGET. Entities
+        missing from the snapshot fall back to the online store.
+
+        Args:
+            entity_rows (List[Dict]): Entity key/value mappings, one per feature vector.
+            feature_service (str, optional): Name of the feature service. Defaults to the serving features.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(entity_rows), layout width).
+        """
+        name = feature_service or self.serving_feature_service
+        layout = self._layout(name)
+        shared_snapshot = self._shared_snapshots.get(name)
+        if shared_snapshot is None:
+            return self._get_redis_snapshot_vectors(entity_rows, name)
+
+        # Serve from the host-wide memory mapped snapshot, only going to
+        # Redis for entities it does not hold
+        out, missing = shared_snapshot.lookup([
+            snapshot.entity_id(entity_row, layout.join_keys)
+            for entity_row in entity_rows
+        ])
+        if out.shape[1] != layout.width:
+            out = np.empty((len(entity_rows), layout.width), dtype=np.float32)
+            missing = list(range(len(entity_rows)))
+        if missing:
+            try:
+                out[missing] = self._get_redis_snapshot_vectors(
+                    [entity_rows[i] for i in missing], name
+                )
+            except FeatureFetchError as why:
+                out[missing] = why.vectors
+                why.failed = [missing[i] for i in why.failed]
+                why.vectors = out
+                raise
+        return out
+
+    def _get_redis_snapshot_vectors(
+        self,
+        entity_rows: List[Dict],
+        name: str
+    ) -> np.ndarray:
+        """
+        Fetch precomputed feature vectors from Redis with a single MGET,
+        falling back to the online store for missing entities. Vectors read
+        from the snapshot are cached as fallbacks for when Redis is degraded.
+        """
+        layout = self._layout(name)
+        if not entity_rows:
+            # Redis rejects an MGET without keys
+            return np.empty((0, layout.width), dtype=np.float32)
+        try:
+            values = self._call(self.redis_client.mget, [
+                snapshot.snapshot_key(
+                    self._fs.project,
+                    name,
+                    snapshot.entity_id(entity_row, layout.join_keys)
+                )
+                for entity_row in entity_rows
+            ])
+        except FeatureFetchError as why:
+            # Let the online store path apply its own fallbacks
+            logging.warning(f"Snapshot read failed for {name}: {why}")
+            values = [None] * len(entity_rows)
+        # Vectors written for another layout (e.g. before a feature was added
+        # and the next materialization) are treated as misses
+        nbytes = layout.width * snapshot.SNAPSHOT_DTYPE.itemsize
+        misses = [
+            i for i, value in enumerate(values)
+            if value is None or len(value) != nbytes
+        ]
+        if not misses:
+            packed = np.frombuffer(b"".join(values), dtype=snapshot.SNAPSHOT_DTYPE)
+            out = packed.reshape(len(entity_rows), layout.width)
+            self._cache_vectors(name, entity_rows, out)
+            return out
+
+        out = np.empty((len(entity_rows), layout.width), dtype=np.float32)
+        hits = sorted(set(range(len(values))) - set(misses))
+        for i in hits:
+            out[i] = snapshot.decode_vector(values[i], layout.width)
+        self._cache_vectors(name, [entity_rows[i] for i in hits], out[hits])
+        try:
+            out[misses] = self.get_online_vectors([entity_rows[i] for i in misses], name)
+        except FeatureFetchError as why:
+            out[misses] = why.vectors
+            why.failed = [misses[i] for i in why.failed]
+            why.vectors = out
+            raise
+        return out
+
+    def get_snapshot_version(self, feature_service: Optional[str] = None) -> Optional[str]:
+        """
+        Fetch the time the latest snapshot of a feature service was written,
+        with a single HGET.
+        """
+        name = feature_service or self.serving_feature_service
+        updated_at = self.redis_client.hget(
+            snapshot.meta_key(self._fs.project, name), "updated_at"
+        )
+        return updated_at.decode("utf-8") if updated_at else None
+
+    def read_snapshot(
+        self,
+        feature_service: Optional[str] = None
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Read the whole latest snapshot of a feature service from Redis, e.g.
+        to publish it as a shared memory snapshot.
+
+        Args:
+            feature_service (str, optional): Name of the feature service. Defaults to the serving features.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Entity ids and their vectors.
+        """
+        name = feature_service or self.serving_feature_service
+        layout = self._layout(name)
+        entity_rows = self.get_snapshot_entities(name)
+        vectors = self._get_redis_snapshot_vectors(entity_rows, name)
+        ids = [snapshot.entity_id(entity_row, layout.join_keys) for entity_row in entity_rows]
+        return ids, vectors
+
+    def set_shared_snapshot(
+        self,
+        feature_service: str,
+        shared_snapshot: SharedSnapshot
+    ) -> None:
+        """
+        Serve snapshot lookups of a feature service from a memory mapped
+        snapshot shared by every process on the host.
+
+        Args:
+            feature_service (str): Name of the feature service.
+            shared_snapshot (SharedSnapshot): Shared snapshot to read from.
+        """
+        self._shared_snapshots[feature_service] = shared_snapshot
+
+    def get_snapshot_entities(self, feature_service: Optional[str] = None) -> List[Dict]:
+        """
+        Fetch the entity rows present in the latest snapshot.
+        """
+        name = feature_service or self.serving_feature_service
+        return snapshot.read_entities(
+            self.redis_client,
+            self._fs.project,
+            self._layout(name)
+        )
+
+    @staticmethod
+    def _cache_key(feature_service: str, entity_row: Dict) -> tuple:
+        return (feature_service, tuple(sorted(entity_row.items())))
 
     def get_online_data(self, **entities) -> pd.DataFrame:
         """
@@ -36,20 +531,59 @@ class DataFetcher:
 
         Returns:
             pd.DataFrame: DataFrame consisting of the serving feature set.
+
+        Raises:
+            FeatureFetchError: If the online store call failed under the retry policy.
+        """
+        features = self._call(
+            self._fs.get_online_features,
+            features=self.serving_feature_svc,
+            entity_rows=[entities]
+        ).to_dict()
+        return pd.DataFrame({col: features[col] for col in self.X_cols})
+
+    @staticmethod
+    def build_entity_query(
+        entity_query: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> str:
+        """
+        Bound an entity query to a time range on its event_timestamp column.
+        BigQuery pushes the filter down to the partition column of the
+        underlying table, so only the partitions in range are scanned.
+
+        Args:
+            entity_query (str): Query string selecting entities and an event_timestamp.
+            start_date (datetime, optional): Inclusive start of the range. Defaults to None.
+            end_date (datetime, optional): Inclusive end of the range. Defaults to None.
+
+        Returns:
+            str: Time bounded entity query.
+        """
+        conditions = []
+        if start_date:
+            conditions.append(f"event_timestamp >= TIMESTAMP('{start_date.isoformat()}')")
+        if end_date:
+            conditions.append(f"event_timestamp <= TIMESTAMP('{end_date.isoformat()}')")
+        if not conditions:
+            return entity_query
+        where = " AND ".join(conditions)
+        return f"""
+            SELECT
+                *
+            FROM
+                ({entity_query})
+            WHERE
+                {where}
         """
-        try:
-            features = self._fs.get_online_features(
-                features=self.serving_feature_svc,
-                entity_rows=[entities]
-            ).to_df()
-            return features[self.X_cols]
-        except Exception as why:
-            print(why)
 
     def get_training_data(
         self,
         entity_df: Optional[pd.DataFrame] = None,
-        entity_query: Optional[str] = None
+        entity_query: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
     ) -> pd.DataFrame:
         """
         Fetch point-in-time correct ML Features from the
@@ -58,21 +592,30 @@ class DataFetcher:
         Args:
             entity_df (pd.DataFrame, optional): DataFrame consisting of entities to include in training set. Default to None.
             entity_query (str, optional): Query string to create entity df from offline data source. Default to None.
+            start_date (datetime, optional): Only include entities with an event_timestamp on or after this time. Default to None.
+            end_date (datetime, optional): Only include entities with an event_timestamp on or before this time. Default to None.
 
         Returns:
             pd.DataFrame: DataFrame consisting of historical training data.
+
+        Raises:
+            ValueError: If neither entity_df nor entity_query is given.
+            FeatureFetchError: If the offline store query failed.
         """
+        if entity_df is not None:
+            if start_date:
+                entity_df = entity_df[entity_df.event_timestamp >= start_date]
+            if end_date:
+                entity_df = entity_df[entity_df.event_timestamp <= end_date]
+        elif entity_query:
+            # Otherwise query the offline source of record
+            entity_df = self.build_entity_query(entity_query, start_date, end_date)
+        else:
+            raise ValueError("One of 'entity_df' or 'entity_query' is required")
         try:
-            if entity_df:
-                return self._fs.get_historical_features(
-                    features=self.training_feature_svc,
-                    entity_df=entity_df
-                ).to_df()
-            if entity_query:
-                # Otherwise query the offline source of record
-                return self._fs.get_historical_features(
-                    features=self.training_feature_svc,
-                    entity_df=entity_query
-                ).to_df()
+            return self._fs.get_historical_features(
+                features=self.training_feature_svc,
+                entity_df=entity_df
+            ).to_df()
         except Exception as why:
-            print(why)
+            raise FeatureFetchError(f"Offline store query failed: {why}") from why
@@ -0,0 +1,211 @@
+import numpy as np
+
+from feast import FeatureService, FeatureStore, ValueType
+from functools import partial
+from typing import Dict, List, Mapping, Optional, Sequence
+
+
+# Numpy equivalents for the Feast value types used in feature schemas
+VALUE_TYPE_DTYPES = {
+    ValueType.FLOAT: np.dtype("float32"),
+    ValueType.DOUBLE: np.dtype("float64"),
+    ValueType.INT32: np.dtype("int32"),
+    ValueType.INT64: np.dtype("int64"),
+    ValueType.BOOL: np.dtype("bool"),
+}
+
+
+class FeatureLayout:
+
+    def __init__(
+        self,
+        name: str,
+        columns: List[str],
+        dtypes: Dict[str, np.dtype],
+        join_keys: Optional[List[str]] = None
+    ):
+        """
+        FeatureLayout is the fixed column order, dtypes and width of the
+        feature vectors produced by a single Feast FeatureService.
+
+        Args:
+            name (str): Name of the FeatureService.
+            columns (List[str]): Ordered feature column names.
+            dtypes (Dict[str, np.dtype]): Numpy dtype per feature column.
+            join_keys (List[str], optional): Entity join keys for the FeatureService. Defaults to None.
+        """
+        self.name = name
+        self.columns = list(columns)
+        self.dtypes = dtypes
+        self.join_keys = join_keys or []
+        self.width = len(self.columns)
+        # Precomputed position of each feature within an assembled vector
+        self.index = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_feature_service(
+        cls,
+        feature_service: FeatureService,
+        join_keys: Optional[List[str]] = None
+    ) -> "FeatureLayout":
+        """
+        Derive the layout from the feature view projections of a FeatureService.
+
+        Args:
+            feature_service (FeatureService): Feast FeatureService definition.
+            join_keys (List[str], optional): Entity join keys for the FeatureService. Defaults to None.
+
+        Returns:
+            FeatureLayout: Layout for the FeatureService.
+        """
+        columns, dtypes = [], {}
+        for projection in feature_service.feature_view_projections:
+            for field in projection.features:
+                if field.name in dtypes:
+                    raise ValueError(
+                        f"Feature {field.name} appears more than once in {feature_service.name}"
+                    )
+                columns.append(field.name)
+                dtypes[field.name] = VALUE_TYPE_DTYPES.get(
+                    field.dtype.to_value_type(), np.dtype("object")
+                )
+        return cls(
+            name=feature_service.name,
+            columns=columns,
+            dtypes=dtypes,
+            join_keys=join_keys
+        )
+
+    def difference(self, other: "FeatureLayout") -> List[str]:
+        """
+        Columns in this layout that are not part of another layout.
+
+        Args:
+            other (FeatureLayout): Layout to compare against.
+
+        Returns:
+            List[str]: Ordered column names only found in this layout.
+        """
+        return [col for col in self.columns if col not in other.index]
+
+    def assemble(
+        self,
+        features: Mapping[str, Sequence],
+        dtype: np.dtype = np.float32
+    ) -> np.ndarray:
+        """
+        Assemble a (rows, width) matrix of feature vectors from a column mapping
+        like the one returned by Feast `OnlineResponse.to_dict()`.
+
+        Args:
+            features (Mapping[str, Sequence]): Feature column name to values.
+            dtype (np.dtype, optional): Output dtype. Defaults to np.float32.
+
+        Returns:
+            np.ndarray: Feature matrix in layout column order.
+        """
+        rows = len(features[self.columns[0]]) if self.columns else 0
+        out = np.empty((rows, self.width), dtype=dtype)
+        for col, i in self.index.items():
+            out[:, i] = features[col]
+        return out
+
+
+class FeatureRegistry:
+
+    def __init__(self, layouts: List[FeatureLayout]):
+        """
+        FeatureRegistry holds the FeatureLayout of every FeatureService used by
+        the application, derived once at startup.
+
+        Args:
+            layouts (List[FeatureLayout]): Layouts to register.
+        """
+        self._layouts = {layout.name: layout for layout in layouts}
+
+    @classmethod
+    def from_feature_services(
+        cls,
+        feature_services: List[FeatureService]
+    ) -> "FeatureRegistry":
+        """
+        Build the registry from FeatureService definitions (e.g. those in
+        `feature_store.repo.features`) without touching the feature store.
+        """
+        return cls([
+            FeatureLayout.from_feature_service(feature_service)
+            for feature_service in feature_services
+        ])
+
+    @classmethod
+    def from_feature_store(
+        cls,
+        fs: FeatureStore,
+        names: List[str]
+    ) -> "FeatureRegistry":
+        """
+        Build the registry from FeatureServices applied to a Feast FeatureStore,
+        resolving the entity join keys of each one.
+
+        Args:
+            fs (FeatureStore): Feast FeatureStore object, or a RegistryCache with the same getters.
+            names (List[str]): Names of the FeatureServices to register.
+        """
+        if isinstance(fs, FeatureStore):
+            # Feast getters re-read the registry on every call by default, so
+            # resolve everything from its cached registry instead
+            feature_views = {
+                feature_view.name: feature_view
+                for feature_view in fs.list_feature_views(allow_cache=True)
+            }
+            entities = {
+                entity.name: entity
+                for entity in fs.list_entities(allow_cache=True)
+            }
+            get_feature_service = partial(fs.get_feature_service, allow_cache=True)
+            get_feature_view, get_entity = feature_views.__getitem__, entities.__getitem__
+        else:
+            get_feature_service = fs.get_feature_service
+            get_feature_view, get_entity = fs.get_feature_view, fs.get_entity
+
+        layouts = []
+        for name in names:
+            feature_service = get_feature_service(name)
+            join_keys = []
+            for projection in feature_service.feature_view_projections:
+                feature_view = get_feature_view(projection.name)
+                for entity_name in feature_view.entities:
+                    join_key = get_entity(entity_name).join_key
+                    if join_key not in join_keys:
+                        join_keys.append(join_key)
+            layouts.append(
+                FeatureLayout.from_feature_service(feature_service, join_keys)
+            )
+        return cls(layouts)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layouts
+
+    def add(self, layout: FeatureLayout) -> None:
+        """
+        Register the layout of another FeatureService.
+
+        Args:
+            layout (FeatureLayout): Layout to register.
+        """
+        self._layouts[layout.name] = layout
+
+    def get(self, name: str) -> FeatureLayout:
+        """
+        Fetch the layout of a registered FeatureService.
+
+        Args:
+            name (str): Name of the FeatureService.
+
+        Returns:
+            FeatureLayout: Layout for the FeatureService.
+        """
+        try:
+            return self._layouts[name]
+        except KeyError:
+            raise ValueError(f"Feature service {name} is not registered")
@@ -0,0 +1,462 @@
+import hashlib
+import json
+import math
+import numpy as np
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .feature_registry import FeatureLayout
+
+
+STATS_PREFIX = "stats"
+
+
+class RunningStats:
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        min: float = math.inf,
+        max: float = -math.inf
+    ):
+        """
+        RunningStats keeps the count, mean and variance of a stream of values
+        with Welford's method, and can merge with other partial results.
+        """
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def update(self, values: np.ndarray) -> "RunningStats":
+        """
+        Add a batch of values, ignoring NaNs.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            batch_mean = float(values.mean())
+            self.merge(RunningStats(
+                count=int(values.size),
+                mean=batch_mean,
+                m2=float(((values - batch_mean) ** 2).sum()),
+                min=float(values.min()),
+                max=float(values.max())
+            ))
+        return self
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Merge another partial result into this one (Chan et al.).
+        """
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        return cls(
+            count=data["count"],
+            mean=data["mean"],
+            m2=data["m2"],
+            min=data["min"] if data["min"] is not None else math.inf,
+            max=data["max"] if data["max"] is not None else -math.inf
+        )
+
+
+class QuantileSketch:
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_bins: int = 512
+    ):
+        """
+        QuantileSketch is a mergeable, log-bucketed quantile sketch (in the
+        style of DDSketch): quantiles are accurate to within a relative
+        error of `relative_accuracy`, in a bounded number of bins.
+
+        Args:
+            relative_accuracy (float, optional): Relative error of quantile estimates. Defaults to 0.01.
+            max_bins (int, optional): Maximum bins per sign; the lowest bins are collapsed beyond it. Defaults to 512.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+
+    @property
+    def count(self) -> int:
+        return self.zeros + sum(self.positive.values()) + sum(self.negative.values())
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        """
+        Add a batch of values, ignoring NaNs.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.zeros += int((values == 0).sum())
+        for bins, magnitudes in ((self.positive, values[values > 0]),
+                                 (self.negative, -values[values < 0])):
+            if magnitudes.size:
+                keys, counts = np.unique(
+                    np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                    return_counts=True
+                )
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    bins[key] = bins.get(key, 0) + count
+        self._collapse()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self._collapse()
+        return self
+
+    def _collapse(self):
+        # Fold the smallest magnitudes together to bound the sketch size
+        for bins in (self.positive, self.negative):
+            if len(bins) > self.max_bins:
+                keys = sorted(bins)
+                cutoff = keys[len(keys) - self.max_bins]
+                folded = sum(bins.pop(key) for key in keys if key < cutoff)
+                bins[cutoff] += folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-th quantile (0 <= q <= 1).
+        """
+        count = self.count
+        if not count:
+            return None
+        rank = q * (count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "positive": self.positive,
+            "negative": self.negative,
+            "zeros": self.zeros
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zeros = data["zeros"]
+        return sketch
+
+
+class FeatureStats:
+
+    def __init__(
+        self,
+        moments: Optional[RunningStats] = None,
+        sketch: Optional[QuantileSketch] = None
+    ):
+        """
+        FeatureStats is the streaming summary of a single feature: moments
+        and a quantile sketch.
+        """
+        self.moments = moments or RunningStats()
+        self.sketch = sketch or QuantileSketch()
+
+    def update(self, values: np.ndarray) -> "FeatureStats":
+        self.moments.update(values)
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other: "FeatureStats") -> "FeatureStats":
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "moments": self.moments.to_dict(),
+            "sketch": self.sketch.to_dict()
+        })
+
+    @classmethod
+    def loads(cls, data: str) -> "FeatureStats":
+        data = json.loads(data)
+        return cls(
+            moments=RunningStats.from_dict(data["moments"]),
+            sketch=QuantileSketch.from_dict(data["sketch"])
+        )
+
+
+def compare_stats(
+    a: FeatureStats,
+    b: FeatureStats,
+    quantiles: Sequence[float] = (0.1, 0.5, 0.9)
+) -> dict:
+    """
+    Summarize the drift of a feature between two windows.
+
+    Args:
+        a (FeatureStats): Reference window statistics.
+        b (FeatureStats): Current window statistics.
+        quantiles (Sequence[float], optional): Quantiles to compare. Defaults to (0.1, 0.5, 0.9).
+
+    Returns:
+        dict: Counts, means, the standardized mean difference, the standard
+            deviation ratio and the shift of each quantile.
+    """
+    pooled = math.sqrt((a.moments.variance + b.moments.variance) / 2)
+    return {
+        "count": (a.moments.count, b.moments.count),
+        "mean": (a.moments.mean, b.moments.mean),
+        "standardized_mean_difference":
+            (b.moments.mean - a.moments.mean) / pooled if pooled else 0.0,
+        "std_ratio": b.moments.std / a.moments.std if a.moments.std else None,
+        "quantile_shift": {
+            q: None if a.sketch.quantile(q) is None or b.sketch.quantile(q) is None
+            else b.sketch.quantile(q) - a.sketch.quantile(q)
+            for q in quantiles
+        }
+    }
+
+
+class FeatureStatsStore:
+    meta_field = "_meta"
+
+    def __init__(
+        self,
+        redis_client,
+        project: str,
+        layout: FeatureLayout
+    ):
+        """
+        FeatureStatsStore persists point-in-time statistics of a feature
+        service's snapshot in Redis: one hash per window (e.g. materialization
+        date) summarizing the latest vector of each entity, with a compact JSON
+        summary per feature, plus a sorted set of windows. Windows are not
+        accumulated; each one describes the snapshot as of when it was written.
+
+        Args:
+            redis_client: Redis client.
+            project (str): Feast project name.
+            layout (FeatureLayout): Layout of the feature service.
+        """
+        self.redis_client = redis_client
+        self.project = project
+        self.layout = layout
+
+    def window_key(self, window: str) -> str:
+        return f"{STATS_PREFIX}:{self.project}:{self.layout.name}:{window}"
+
+    def windows_key(self) -> str:
+        return f"{STATS_PREFIX}:{self.project}:{self.layout.name}:windows"
+
+    def last_run_key(self) -> str:
+        return f"{STATS_PREFIX}:{self.project}:{self.layout.name}:last_run"
+
+    def write(
+        self,
+        window: str,
+        vectors: np.ndarray,
+        materialized_at: Optional[datetime] = None
+    ) -> Optional[Dict[str, FeatureStats]]:
+        """
+        Compute and store the statistics of a snapshot for one window. A
+        snapshot identical to the one of the latest window (e.g. a daily run
+        over weekly data) is not stored again, but the run is still recorded
+        for freshness.
+
+        Args:
+            window (str): Window id, e.g. the materialization date.
+            vectors (np.ndarray): Snapshot feature matrix in layout order, one row per entity.
+            materialized_at (datetime, optional): Materialization time, for freshness. Defaults to now.
+
+        Returns:
+            Dict[str, FeatureStats]: Statistics per feature, or None if the
+                snapshot was unchanged and nothing was stored.
+        """
+        materialized_at = materialized_at or datetime.utcnow()
+        digest = hashlib.sha1(np.ascontiguousarray(vectors).tobytes()).hexdigest()
+        last_run = {
+            "materialized_at": materialized_at.isoformat(),
+            "window": window,
+            "rows": int(vectors.shape[0]),
+            "digest": digest
+        }
+        windows = self.windows()
+        if windows and windows[-1] != window:
+            latest = self.freshness(windows[-1])
+            if latest and latest.get("digest") == digest:
+                # The latest window still describes the snapshot
+                last_run["window"] = windows[-1]
+                self.redis_client.set(self.last_run_key(), json.dumps(last_run))
+                return None
+
+        stats = {
+            col: FeatureStats().update(vectors[:, i])
+            for col, i in self.layout.index.items()
+        }
+        mapping = {col: feature_stats.dumps() for col, feature_stats in stats.items()}
+        mapping[self.meta_field] = json.dumps({
+            "materialized_at": materialized_at.isoformat(),
+            "rows": int(vectors.shape[0]),
+            "digest": digest
+        })
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.delete(self.window_key(window))
+        pipe.hset(self.window_key(window), mapping=mapping)
+        pipe.zadd(self.windows_key(), {window: materialized_at.timestamp()})
+        pipe.set(self.last_run_key(), json.dumps(last_run))
+        pipe.execute()
+        return stats
+
+    def windows(self) -> List[str]:
+        """
+        Stored windows, oldest first.
+        """
+        return [w.decode("utf-8") for w in self.redis_client.zrange(self.windows_key(), 0, -1)]
+
+    def _loads(self, data: dict) -> Dict[str, FeatureStats]:
+        return {
+            field.decode("utf-8"): FeatureStats.loads(value)
+            for field, value in data.items()
+            if field.decode("utf-8") != self.meta_field
+        }
+
+    def read(self, window: str) -> Dict[str, FeatureStats]:
+        """
+        Fetch the statistics of one window.
+        """
+        return self._loads(self.redis_client.hgetall(self.window_key(window)))
+
+    def read_range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict[str, FeatureStats]:
+        """
+        Merge the statistics of every window from start to end into a
+        summary of the period, fetched in a single round trip. Window ids
+        are compared as strings, so they must sort chronologically (e.g. the
+        ISO dates written by materialization).
+
+        Args:
+            start (str, optional): First window, inclusive. Defaults to the oldest window.
+            end (str, optional): Last window, inclusive. Defaults to the latest window.
+
+        Returns:
+            Dict[str, FeatureStats]: Merged statistics per feature.
+        """
+        windows = [
+            window for window in self.windows()
+            if (start is None or window >= start) and (end is None or window <= end)
+        ]
+        pipe = self.redis_client.pipeline(transaction=False)
+        for window in windows:
+            pipe.hgetall(self.window_key(window))
+        merged = {}
+        for data in pipe.execute() if windows else []:
+            for col, feature_stats in self._loads(data).items():
+                if col in merged:
+                    merged[col].merge(feature_stats)
+                else:
+                    merged[col] = feature_stats
+        return merged
+
+    def _read_period(
+        self,
+        period: Union[str, Tuple[Optional[str], Optional[str]]]
+    ) -> Dict[str, FeatureStats]:
+        if isinstance(period, tuple):
+            return self.read_range(*period)
+        return self.read(period)
+
+    def freshness(self, window: Optional[str] = None) -> Optional[dict]:
+        """
+        Fetch when a window was materialized, how many rows it summarized and
+        a digest of its snapshot.
+
+        Args:
+            window (str, optional): Window id. Defaults to the latest materialization
+                run, including runs whose unchanged snapshot was not stored again
+                (its "window" is the window holding the statistics).
+        """
+        if window is None:
+            meta = self.redis_client.get(self.last_run_key())
+        else:
+            meta = self.redis_client.hget(self.window_key(window), self.meta_field)
+        return json.loads(meta) if meta else None
+
+    def compare(
+        self,
+        window_a: Union[str, Tuple[Optional[str], Optional[str]]],
+        window_b: Union[str, Tuple[Optional[str], Optional[str]]]
+    ) -> Dict[str, dict]:
+        """
+        Compare the statistics of two windows, or two periods of merged
+        windows, per feature.
+
+        Args:
+            window_a (Union[str, Tuple[str, str]]): Reference window, or (start, end) period (see read_range).
+            window_b (Union[str, Tuple[str, str]]): Current window, or (start, end) period.
+
+        Returns:
+            Dict[str, dict]: Drift summary per feature (see compare_stats).
+        """
+        stats_a, stats_b = self._read_period(window_a), self._read_period(window_b)
+        return {
+            col: compare_stats(stats_a[col], stats_b[col])
+            for col in self.layout.columns
+            if col in stats_a and col in stats_b
+        }
@@ -1,10 +1,17 @@
-import pickle
 import redis
 
+from typing import Optional
+from .serializers import (
+    PickleSerializer,
+    Serializer,
+    get_serializer
+)
+
 
 class RedisModelRepo:
     model_prefix = "model"
     versions = "versions"
+    formats = "formats"
     latest = "latest"
     latest_version = None
     model_name = None
@@ -14,7 +21,8 @@ class RedisModelRepo:
         host: str,
         port: str,
         password: str,
-        model_name = str
+        model_name: str,
+        serializer: Optional[Serializer] = None
     ):
         """
         ModelRepo is a basic storage and versioning layer for ML models using
@@ -24,6 +32,8 @@ class RedisModelRepo:
             host (str): Redis host.
             port (str): Redis port.
             password (str): Redis password.
+            model_name (str): Name of the model.
+            serializer (Serializer, optional): Serializer for new model versions. Defaults to pickle.
         """
         self.redis_client = redis.Redis(
             host=host,
@@ -31,6 +41,7 @@ class RedisModelRepo:
             password=password
         )
         self.model_name = model_name
+        self.serializer = serializer or PickleSerializer()
         self.latest_version = self.redis_client.hlen(self.model_versions())
 
     @classmethod
@@ -40,12 +51,21 @@ class RedisModelRepo:
             host=host,
             port=port,
             password=config.REDIS_PASSWORD,
-            model_name=config.MODEL_NAME
+            model_name=config.MODEL_NAME,
+            serializer=get_serializer(config.MODEL_SERIALIZER)
         )
 
     def model_versions(self) -> str:
         return f"{self.model_prefix}:{self.model_name}:{self.versions}"
 
+    def model_formats(self) -> str:
+        return f"{self.model_prefix}:{self.model_name}:{self.formats}"
+
+    def _loads(self, data: bytes, fmt: Optional[bytes]):
+        # Versions saved before formats were recorded are pickles
+        serializer = get_serializer(fmt.decode("utf-8")) if fmt else PickleSerializer()
+        return serializer.loads(data)
+
     def save_version(self, model) -> int:
         """
         Persist the model in the database and increment
@@ -57,13 +77,20 @@ class RedisModelRepo:
         Returns:
             int: Model version number.
         """
-        pickle_out = pickle.dumps(model)
+        model_out = self.serializer.dumps(model)
         new_version = self.latest_version + 1
-        res = self.redis_client.hset(
+        pipe = self.redis_client.pipeline()
+        pipe.hset(
             name=self.model_versions(),
             key=str(new_version),
-            value=pickle_out
+            value=model_out
+        )
+        pipe.hset(
+            name=self.model_formats(),
+            key=str(new_version),
+            value=self.serializer.name
         )
+        res, _ = pipe.execute()
         if res:
             # TODO some checks... increment version
             self.latest_version = new_version
@@ -77,13 +104,12 @@ class RedisModelRepo:
             version (int): Model version number to fetch.
         """
         print(version, flush=True)
-        res = self.redis_client.hget(
-            name=self.model_versions(),
-            key=str(version)
-        )
+        pipe = self.redis_client.pipeline()
+        pipe.hget(name=self.model_versions(), key=str(version))
+        pipe.hget(name=self.model_formats(), key=str(version))
+        res, fmt = pipe.execute()
         if res:
-            pickle_out = pickle.loads(res)
-            return pickle_out
+            return self._loads(res, fmt)
 
     def fetch_all_versions(self) -> dict:
         """
@@ -92,18 +118,15 @@ class RedisModelRepo:
         Returns:
             dict: Dictionary of model_version : model object.
         """
-        res = self.redis_client.hgetall(name=self.model_versions())
+        pipe = self.redis_client.pipeline()
+        pipe.hgetall(name=self.model_versions())
+        pipe.hgetall(name=self.model_formats())
+        res, fmts = pipe.execute()
         if res:
-            return {k: pickle.loads(v) for k, v in res.items()}
+            return {k: self._loads(v, fmts.get(k)) for k, v in res.items()}
 
     def fetch_latest(self):
         """
         Fetch the latest model version.
         """
-        res = self.redis_client.hget(
-            name=self.model_versions(),
-            key=str(self.latest_version)
-        )
-        if res:
-            pickle_out = pickle.loads(res)
-            return pickle_out
\ No newline at end of file
+        return self.fetch_version(self.latest_version)
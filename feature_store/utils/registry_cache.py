@@ -0,0 +1,169 @@
+import os
+import tempfile
+import threading
+import time
+
+from feast import FeatureStore, RepoConfig
+from feast.repo_config import RegistryConfig
+from google.cloud import storage
+from typing import Optional
+from .logger import get_logger
+
+
+logging = get_logger()
+
+class RegistryCache:
+
+    def __init__(
+        self,
+        repo_config: RepoConfig,
+        local_dir: str,
+        refresh_interval: float
+    ):
+        """
+        RegistryCache keeps a local copy of a Feast registry stored in GCS and
+        serves a read-only FeatureStore from it. The local copy is only
+        re-downloaded when the GCS object generation changes, and is checked
+        at most once per refresh interval.
+
+        Args:
+            repo_config (RepoConfig): Feast repo config pointing at a gs:// registry.
+            local_dir (str): Directory to keep the local registry copy in.
+            refresh_interval (float): Minimum seconds between checks for a new registry.
+        """
+        registry = repo_config.get_registry_config().path
+        if not registry.startswith("gs://"):
+            raise ValueError(f"Registry {registry} is not stored in GCS")
+        self.bucket_name, self.remote_filename = registry[len("gs://"):].split("/", 1)
+        self.refresh_interval = refresh_interval
+        self.local_path = os.path.join(
+            local_dir,
+            self.bucket_name,
+            self.remote_filename
+        )
+        os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+        self.generation = self._read_generation()
+        self._last_sync = None
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._blob = storage.Client().bucket(self.bucket_name).blob(self.remote_filename)
+
+        self.sync(force=True)
+        # Feast only re-reads the local file on refresh_registry(), which is
+        # called whenever a new generation is synced
+        self.store = FeatureStore(
+            config=repo_config.copy(update={
+                "registry": RegistryConfig(
+                    path=self.local_path,
+                    cache_ttl_seconds=0
+                )
+            })
+        )
+        self._build_lookups()
+
+    def _generation_path(self) -> str:
+        return f"{self.local_path}.generation"
+
+    def _read_generation(self) -> Optional[int]:
+        if not os.path.exists(self.local_path):
+            return None
+        try:
+            with open(self._generation_path()) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Download the registry if the GCS object generation changed since the
+        local copy was taken.
+
+        Args:
+            force (bool, optional): Check GCS regardless of the refresh interval. Defaults to False.
+
+        Returns:
+            bool: True if a new registry was downloaded.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_sync is not None \
+                    and now - self._last_sync < self.refresh_interval:
+                return False
+            self._last_sync = now
+
+            blob = self._blob
+            blob.reload()
+            if blob.generation == self.generation:
+                return False
+
+            # Download next to the target and swap it in atomically so
+            # concurrent readers never see a partial registry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.local_path))
+            os.close(fd)
+            try:
+                blob.download_to_filename(tmp_path, if_generation_match=blob.generation)
+                os.replace(tmp_path, self.local_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with open(self._generation_path(), "w") as f:
+                f.write(str(blob.generation))
+            self.generation = blob.generation
+            logging.info(f"Synced registry generation {self.generation}")
+            return True
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Sync the local registry and reload the feature store and lookup maps
+        when it changed.
+
+        Returns:
+            bool: True if the registry was reloaded.
+        """
+        if not self.sync(force=force):
+            return False
+        self.store.refresh_registry()
+        self._build_lookups()
+        return True
+
+    def _build_lookups(self):
+        self.feature_services = {
+            feature_service.name: feature_service
+            for feature_service in self.store.list_feature_services()
+        }
+        self.feature_views = {
+            feature_view.name: feature_view
+            for feature_view in self.store.list_feature_views()
+        }
+        self.entities = {
+            entity.name: entity
+            for entity in self.store.list_entities()
+        }
+
+    def get_feature_service(self, name: str):
+        return self.feature_services[name]
+
+    def get_feature_view(self, name: str):
+        return self.feature_views[name]
+
+    def get_entity(self, name: str):
+        return self.entities[name]
+
+    def start_refresher(self):
+        """
+        Refresh the registry in a background thread every refresh interval
+        so serving never waits on GCS.
+        """
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.refresh_interval)
+                try:
+                    self.refresh()
+                except Exception as why:
+                    logging.warning(f"Registry refresh failed: {why}")
+
+        self._refresher = threading.Thread(target=run, daemon=True)
+        self._refresher.start()
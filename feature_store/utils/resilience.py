@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, List, Optional
+from .logger import get_logger
+
+
+logging = get_logger()
+
+class FeatureFetchError(Exception):
+
+    def __init__(self, message: str, failed: Optional[List[int]] = None):
+        """
+        Raised when feature vectors could not be fetched or filled from a fallback.
+
+        Args:
+            message (str): Error message.
+            failed (List[int], optional): Indices of the entity rows that could not be served. Defaults to None.
+        """
+        super().__init__(message)
+        self.failed = failed or []
+        self.vectors = None
+
+
+class CircuitOpenError(FeatureFetchError):
+    pass
+
+
+class CircuitBreaker:
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        """
+        CircuitBreaker stops calling a degraded dependency after consecutive
+        failures, and lets a single trial call through once the reset timeout
+        has passed.
+
+        Args:
+            failure_threshold (int): Consecutive failures before the circuit opens.
+            reset_timeout (float): Seconds the circuit stays open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be attempted now.
+        """
+        with self._lock:
+            if self.state == self.open:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.half_open
+                return True
+            # Only one trial call at a time while half open
+            return self.state == self.closed
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = self.closed
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.half_open or self._failures >= self.failure_threshold:
+                if self.state != self.open:
+                    logging.warning("Circuit opened")
+                self.state = self.open
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+
+    def __init__(
+        self,
+        timeout: float,
+        max_retries: int,
+        backoff: float,
+        max_backoff: float,
+        breaker: Optional[CircuitBreaker] = None,
+        max_workers: int = 4
+    ):
+        """
+        RetryPolicy runs calls with a per-call timeout and bounded retries
+        with full jitter backoff, guarded by an optional circuit breaker.
+
+        Args:
+            timeout (float): Seconds to wait for each attempt.
+            max_retries (int): Retries after the first attempt.
+            backoff (float): Base backoff in seconds, doubled per retry.
+            max_backoff (float): Upper bound of the backoff in seconds.
+            breaker (CircuitBreaker, optional): Circuit breaker for the dependency. Defaults to None.
+            max_workers (int, optional): Threads available to run timed calls. Defaults to 4.
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker
+        # Calls run on worker threads so the caller never waits past the
+        # timeout. This is only a backstop: a running call cannot be cancelled
+        # and holds its worker until it returns, so the client itself must
+        # bound its calls (e.g. Redis socket timeouts)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Call a function under the policy.
+
+        Returns:
+            Any: Result of the function.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            FeatureFetchError: If every attempt failed or timed out.
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if self.breaker is not None and not self.breaker.allow():
+                raise CircuitOpenError("Circuit open, skipping online store call")
+            future = self._executor.submit(fn, *args, **kwargs)
+            try:
+                result = future.result(timeout=self.timeout)
+            except TimeoutError:
+                future.cancel()
+                error = TimeoutError(f"Timed out after {self.timeout}s")
+            except Exception as why:
+                error = why
+            else:
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return result
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            logging.warning(f"Attempt {attempt + 1} failed: {error}")
+            if attempt < self.max_retries:
+                time.sleep(self._delay(attempt))
+        raise FeatureFetchError(f"Online store call failed: {error}")
@@ -0,0 +1,154 @@
+import abc
+import json
+import pickle
+import struct
+
+from feast import RepoConfig
+from typing import Any
+
+
+class Serializer(abc.ABC):
+    name = None
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Serialize an object to bytes.
+
+        Args:
+            obj (Any): Some object.
+
+        Returns:
+            bytes: Serialized object.
+        """
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """
+        Deserialize an object from bytes.
+
+        Args:
+            data (bytes): Serialized object.
+
+        Returns:
+            Any: Some object.
+        """
+
+
+class PickleSerializer(Serializer):
+    name = "pickle"
+    # Header for payloads carrying out-of-band buffers: magic, buffer count
+    magic = b"PKL5"
+    header = struct.Struct("<4sI")
+    length = struct.Struct("<Q")
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Pickle with protocol 5, keeping large buffers (e.g. NumPy arrays)
+        out-of-band so they are not copied into the pickle stream.
+        """
+        buffers = []
+        payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        parts = [self.header.pack(self.magic, len(raws))]
+        parts += [self.length.pack(len(part)) for part in [payload, *raws]]
+        parts += [payload, *raws]
+        return b"".join(parts)
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Unpickle, handing out-of-band buffers back as views of the payload.
+        Immutable bytes are copied once into a bytearray first, so loaded
+        arrays stay writable like plain pickles. Plain pickles written before
+        protocol 5 framing load as is.
+        """
+        if not data.startswith(self.magic):
+            return pickle.loads(data)
+        if isinstance(data, bytes):
+            data = bytearray(data)
+        view = memoryview(data)
+        _, n_buffers = self.header.unpack_from(view)
+        offset = self.header.size
+        lengths = []
+        for _ in range(n_buffers + 1):
+            lengths.append(self.length.unpack_from(view, offset)[0])
+            offset += self.length.size
+        parts = []
+        for length in lengths:
+            parts.append(view[offset:offset + length])
+            offset += length
+        return pickle.loads(parts[0], buffers=parts[1:])
+
+
+class RepoConfigSerializer(Serializer):
+    name = "repo_config_json"
+
+    def dumps(self, obj: RepoConfig) -> bytes:
+        """
+        Serialize a Feast RepoConfig to JSON.
+        """
+        return obj.json(exclude={"repo_path"}).encode("utf-8")
+
+    def loads(self, data: bytes) -> RepoConfig:
+        """
+        Rebuild a Feast RepoConfig from JSON.
+        """
+        return RepoConfig(**json.loads(data))
+
+
+class XGBoostSerializer(Serializer):
+
+    def __init__(self, raw_format: str = "ubj"):
+        """
+        Serialize XGBoost models in the native JSON or UBJSON model format.
+
+        Args:
+            raw_format (str, optional): One of "json" or "ubj". Defaults to "ubj".
+        """
+        if raw_format not in ("json", "ubj"):
+            raise ValueError("raw_format must be one of 'json' or 'ubj'")
+        self.raw_format = raw_format
+        self.name = f"xgboost_{raw_format}"
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Serialize an XGBoost Booster or scikit-learn style model.
+        """
+        booster = obj.get_booster() if hasattr(obj, "get_booster") else obj
+        return bytes(booster.save_raw(raw_format=self.raw_format))
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Load an XGBoost Booster.
+        """
+        import xgboost
+
+        booster = xgboost.Booster()
+        booster.load_model(bytearray(data))
+        return booster
+
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in [
+        PickleSerializer(),
+        RepoConfigSerializer(),
+        XGBoostSerializer("json"),
+        XGBoostSerializer("ubj")
+    ]
+}
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Fetch a serializer by name.
+
+    Args:
+        name (str): One of "pickle", "repo_config_json", "xgboost_json" or "xgboost_ubj".
+
+    Returns:
+        Serializer: The serializer.
+    """
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown serializer {name}")
@@ -0,0 +1,223 @@
+import fcntl
+import json
+import mmap
+import numpy as np
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from typing import Callable, List, Optional, Tuple
+from .logger import get_logger
+
+
+logging = get_logger()
+
+# magic, format version, rows, width, index length
+HEADER = struct.Struct("<4sIIII")
+MAGIC = b"FSHM"
+VERSION = 1
+DTYPE = np.dtype("<f4")
+
+
+def write_shared_snapshot(
+    path: str,
+    ids: List[str],
+    vectors: np.ndarray
+) -> None:
+    """
+    Write a feature snapshot file for memory mapping: a header, the JSON
+    list of entity ids and the float32 matrix, aligned to the dtype. The file
+    is replaced atomically, so readers keep their current mapping until they
+    remap.
+
+    Args:
+        path (str): Snapshot file, ideally on a tmpfs such as /dev/shm.
+        ids (List[str]): Entity ids, one per row.
+        vectors (np.ndarray): Matrix of shape (len(ids), width).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=DTYPE)
+    index = json.dumps(ids).encode("utf-8")
+    rows, width = vectors.shape
+    padding = -(HEADER.size + len(index)) % DTYPE.itemsize
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, rows, width, len(index)))
+            f.write(index)
+            f.write(b"\0" * padding)
+            f.write(vectors.tobytes())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class SharedSnapshot:
+
+    def __init__(
+        self,
+        path: str,
+        check_interval: float = 1.0
+    ):
+        """
+        SharedSnapshot is a read-only, memory mapped feature snapshot shared by
+        every process on the host. Pages are shared through the OS page cache,
+        so N readers hold one copy of the data.
+
+        Args:
+            path (str): Snapshot file written by write_shared_snapshot.
+            check_interval (float, optional): Minimum seconds between checks for a newer file. Defaults to 1.0.
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.vectors = None
+        self.index = {}
+        self._stat = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Remap the snapshot if the file was replaced.
+
+        Returns:
+            bool: True if a new snapshot was mapped.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            if self._stat is not None and \
+                    (stat.st_ino, stat.st_mtime_ns) == (self._stat.st_ino, self._stat.st_mtime_ns):
+                return False
+
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, rows, width, index_length = HEADER.unpack_from(mapped)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path} is not a shared feature snapshot")
+            ids = json.loads(mapped[HEADER.size:HEADER.size + index_length])
+            offset = HEADER.size + index_length
+            offset += -offset % DTYPE.itemsize
+            # The old mapping is released once no array references it
+            self.vectors = np.frombuffer(
+                mapped,
+                dtype=DTYPE,
+                count=rows * width,
+                offset=offset
+            ).reshape(rows, width)
+            self.index = {id_: row for row, id_ in enumerate(ids)}
+            self._stat = stat
+            return True
+
+    def lookup(self, ids: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Gather the vectors of many entities.
+
+        Args:
+            ids (List[str]): Entity ids.
+
+        Returns:
+            Tuple[np.ndarray, List[int]]: Matrix in ids order, and the positions
+                of the ids missing from the snapshot (their rows are undefined).
+        """
+        self.refresh()
+        vectors, index = self.vectors, self.index
+        if vectors is None or not len(vectors):
+            width = 0 if vectors is None else vectors.shape[1]
+            return np.empty((len(ids), width), dtype=DTYPE), list(range(len(ids)))
+        rows = [index.get(id_, -1) for id_ in ids]
+        missing = [i for i, row in enumerate(rows) if row < 0]
+        return vectors[rows], missing
+
+
+class SharedSnapshotRefresher:
+
+    def __init__(
+        self,
+        path: str,
+        version: Callable[[], Optional[str]],
+        load: Callable[[], Tuple[List[str], np.ndarray]],
+        interval: float
+    ):
+        """
+        SharedSnapshotRefresher rewrites the shared snapshot from Redis. Every
+        process runs one, but only the holder of an exclusive file lock
+        refreshes; the others take over if it goes away.
+
+        Args:
+            path (str): Snapshot file.
+            version (Callable): Returns a cheap version tag of the source
+                snapshot. The snapshot is only loaded when the tag changes.
+            load (Callable): Returns entity ids and their vectors.
+            interval (float): Seconds between refreshes.
+        """
+        self.path = path
+        self.version = version
+        self.load = load
+        self.interval = interval
+        self._lock_file = open(f"{path}.lock", "a+")
+        self._is_leader = False
+        self._version = None
+        self._thread = None
+
+    def _try_lead(self) -> bool:
+        if not self._is_leader:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._is_leader = True
+                logging.info(f"Refreshing shared snapshot {self.path} from this process")
+            except BlockingIOError:
+                pass
+        return self._is_leader
+
+    def refresh(self) -> bool:
+        """
+        Rewrite the snapshot if this process is the refresher and the source
+        changed. Nothing is published while the source has no snapshot.
+
+        Returns:
+            bool: True if the snapshot file was rewritten.
+        """
+        if not self._try_lead():
+            return False
+        # Read the tag before the vectors: if the source changes in between,
+        # the file is tagged with the older version and rewritten next time
+        version = self.version()
+        if version is None or (version == self._version and os.path.exists(self.path)):
+            return False
+        ids, vectors = self.load()
+        if not ids:
+            logging.warning(f"Snapshot {version} has no entities, not publishing it")
+            return False
+        write_shared_snapshot(self.path, ids, vectors)
+        self._version = version
+        logging.info(f"Wrote shared snapshot of {len(ids)} entities")
+        return True
+
+    def start(self):
+        """
+        Refresh once now, then every interval in a background thread.
+        """
+        if self._thread is not None:
+            return
+        self.refresh()
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.refresh()
+                except Exception as why:
+                    logging.warning(f"Shared snapshot refresh failed: {why}")
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
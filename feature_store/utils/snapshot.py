@@ -0,0 +1,95 @@
+import json
+import numpy as np
+
+from datetime import datetime
+from typing import Dict, List
+from .feature_registry import FeatureLayout
+
+
+SNAPSHOT_PREFIX = "snapshot"
+# Packed vectors are always little-endian float32
+SNAPSHOT_DTYPE = np.dtype("<f4")
+
+
+def entity_id(entity_row: Dict, join_keys: List[str]) -> str:
+    """
+    Stable string id of an entity row.
+    """
+    return ":".join(str(entity_row[key]) for key in join_keys)
+
+def snapshot_key(project: str, feature_service: str, entity: str) -> str:
+    return f"{SNAPSHOT_PREFIX}:{project}:{feature_service}:{entity}"
+
+def entities_key(project: str, feature_service: str) -> str:
+    return f"{SNAPSHOT_PREFIX}:{project}:{feature_service}:entities"
+
+def meta_key(project: str, feature_service: str) -> str:
+    return f"{SNAPSHOT_PREFIX}:{project}:{feature_service}:meta"
+
+
+def write_snapshot(
+    redis_client,
+    project: str,
+    layout: FeatureLayout,
+    entity_rows: List[Dict],
+    vectors: np.ndarray
+) -> None:
+    """
+    Write one packed float32 feature vector per entity, plus the set of
+    entities and the vector layout, in a single transaction. Vectors of
+    entities missing from this snapshot are deleted in the same transaction.
+
+    Args:
+        redis_client: Redis client.
+        project (str): Feast project name.
+        layout (FeatureLayout): Layout of the feature service.
+        entity_rows (List[Dict]): Entity key/value mappings, one per vector.
+        vectors (np.ndarray): Matrix of shape (len(entity_rows), layout width).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=SNAPSHOT_DTYPE)
+    ids = [entity_id(entity_row, layout.join_keys) for entity_row in entity_rows]
+    stale = {
+        member.decode("utf-8")
+        for member in redis_client.smembers(entities_key(project, layout.name))
+    }.difference(ids)
+    pipe = redis_client.pipeline(transaction=True)
+    if stale:
+        pipe.delete(*(snapshot_key(project, layout.name, id_) for id_ in sorted(stale)))
+    if ids:
+        pipe.mset({
+            snapshot_key(project, layout.name, id_): vector.tobytes()
+            for id_, vector in zip(ids, vectors)
+        })
+    pipe.delete(entities_key(project, layout.name))
+    if ids:
+        pipe.sadd(entities_key(project, layout.name), *ids)
+    pipe.hset(meta_key(project, layout.name), mapping={
+        "columns": json.dumps(layout.columns),
+        "join_keys": json.dumps(layout.join_keys),
+        "width": layout.width,
+        "updated_at": datetime.utcnow().isoformat()
+    })
+    pipe.execute()
+
+def decode_vector(value: bytes, width: int) -> np.ndarray:
+    """
+    Decode a packed vector without copying it. The array is read-only.
+    """
+    vector = np.frombuffer(value, dtype=SNAPSHOT_DTYPE)
+    if vector.shape[0] != width:
+        raise ValueError(f"Snapshot vector has {vector.shape[0]} features, expected {width}")
+    return vector
+
+def read_entities(
+    redis_client,
+    project: str,
+    layout: FeatureLayout
+) -> List[Dict]:
+    """
+    Fetch the entity rows of the latest snapshot.
+    """
+    ids = sorted(
+        member.decode("utf-8")
+        for member in redis_client.smembers(entities_key(project, layout.name))
+    )
+    return [dict(zip(layout.join_keys, id_.split(":"))) for id_ in ids]
@@ -1,9 +1,17 @@
+import os
 import requests
-import pickle
 
-from feast import FeatureStore
+from feast import FeatureStore, RepoConfig
+from functools import lru_cache
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
-from typing import Any
+from typing import Any, Optional
+from .registry_cache import RegistryCache
+from .serializers import (
+    PickleSerializer,
+    RepoConfigSerializer,
+    Serializer
+)
 
 
 def get_feature_store(
@@ -18,12 +26,90 @@ def get_feature_store(
         FeatureStore: Feast FeatureStore
     """
     return FeatureStore(
-        config = fetch_pkl(
+        config = fetch_repo_config(
             remote_filename=config_path,
             bucket_name=bucket_name
         )
     )
 
+@lru_cache(maxsize=None)
+def get_shared_registry_cache(
+    config_path: str,
+    bucket_name: str,
+    local_dir: str,
+    refresh_interval: float,
+    socket_timeout: Optional[float] = None,
+    socket_connect_timeout: Optional[float] = None
+) -> RegistryCache:
+    """
+    Fetch the process-wide registry cache, a read-only Feast Feature Store
+    backed by a local copy of the registry that is refreshed in the background.
+
+    Args:
+        config_path (str): Path to the repo config within the GCS bucket.
+        bucket_name (str): Name of the GCS bucket.
+        local_dir (str): Directory to keep the local registry copy in.
+        refresh_interval (float): Seconds between checks for a new registry.
+        socket_timeout (float, optional): Seconds to wait on an online store Redis socket. Defaults to None (no timeout).
+        socket_connect_timeout (float, optional): Seconds to wait for an online store Redis connection. Defaults to None (no timeout).
+
+    Returns:
+        RegistryCache: Shared registry cache.
+    """
+    repo_config = fetch_repo_config(
+        remote_filename=config_path,
+        bucket_name=bucket_name
+    )
+    registry_cache = RegistryCache(
+        repo_config=with_redis_timeouts(
+            repo_config,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout
+        ),
+        local_dir=local_dir,
+        refresh_interval=refresh_interval
+    )
+    registry_cache.start_refresher()
+    return registry_cache
+
+def with_redis_timeouts(
+    repo_config: RepoConfig,
+    socket_timeout: Optional[float] = None,
+    socket_connect_timeout: Optional[float] = None
+) -> RepoConfig:
+    """
+    Copy a Feast RepoConfig with socket timeouts on its Redis online store,
+    so a hung connection (e.g. during a failover) fails the call instead of
+    blocking it indefinitely.
+
+    Args:
+        repo_config (RepoConfig): Feast repo config with a Redis online store.
+        socket_timeout (float, optional): Seconds to wait on a socket read or write. Defaults to None (unchanged).
+        socket_connect_timeout (float, optional): Seconds to wait for a connection. Defaults to None (unchanged).
+
+    Returns:
+        RepoConfig: Feast repo config.
+    """
+    timeouts = {
+        "socket_timeout": socket_timeout,
+        "socket_connect_timeout": socket_connect_timeout
+    }
+    timeouts = {key: value for key, value in timeouts.items() if value is not None}
+    if not timeouts:
+        return repo_config
+    # Feast passes key=value options of the connection string to the Redis client
+    online_store = repo_config.online_store
+    options = [
+        option for option in online_store.connection_string.split(",")
+        if option.split("=", 1)[0].strip() not in timeouts
+    ]
+    options += [f"{key}={value}" for key, value in timeouts.items()]
+    return repo_config.copy(update={
+        "online_store": online_store.copy(update={
+            "connection_string": ",".join(options)
+        })
+    })
+
 def get_blob(
     remote_filename: str,
     bucket_name: str
@@ -57,6 +143,44 @@ def upload_file(
     blob = get_blob(remote_filename, bucket_name)
     blob.upload_from_filename(local_filename)
 
+def upload_obj(
+    obj: Any,
+    bucket_name: str,
+    remote_filename: str,
+    serializer: Serializer
+) -> None:
+    """
+    Upload an object to GCS with the given serializer.
+
+    Args:
+        obj (Any): Some object.
+        bucket_name (str): Name of the GCS bucket.
+        remote_filename (str): Path to the remote file within the GCS bucket.
+        serializer (Serializer): Serializer to write the object with.
+    """
+    blob = get_blob(remote_filename, bucket_name)
+    blob.upload_from_string(serializer.dumps(obj))
+
+def fetch_obj(
+    bucket_name: str,
+    remote_filename: str,
+    serializer: Serializer
+) -> Any:
+    """
+    Fetch an object from GCS with the given serializer.
+
+    Args:
+        bucket_name (str): Name of the GCS bucket.
+        remote_filename (str): Path to the remote file within the GCS bucket.
+        serializer (Serializer): Serializer to read the object with.
+
+    Returns:
+        Any: Some object.
+    """
+    # Get the blob and download
+    blob = get_blob(remote_filename, bucket_name)
+    return serializer.loads(blob.download_as_bytes())
+
 def upload_pkl(
     obj: Any,
     bucket_name: str,
@@ -70,9 +194,7 @@ def upload_pkl(
         bucket_name (str): Name of the GCS bucket.
         remote_filename (str): Path to the remote file within the GCS bucket.
     """
-    blob = get_blob(remote_filename, bucket_name)
-    pickle_out = pickle.dumps(obj)
-    blob.upload_from_string(pickle_out)
+    upload_obj(obj, bucket_name, remote_filename, PickleSerializer())
 
 def fetch_pkl(
     bucket_name: str,
@@ -88,11 +210,46 @@ def fetch_pkl(
     Returns:
         Any: Some object.
     """
-    # Get the blob and download
-    blob = get_blob(remote_filename, bucket_name)
-    pickle_in = blob.download_as_string()
-    obj = pickle.loads(pickle_in)
-    return obj
+    return fetch_obj(bucket_name, remote_filename, PickleSerializer())
+
+def upload_repo_config(
+    repo_config: Any,
+    bucket_name: str,
+    remote_filename: str
+) -> None:
+    """
+    Upload a Feast RepoConfig to GCS as JSON.
+
+    Args:
+        repo_config (RepoConfig): Feast repo config.
+        bucket_name (str): Name of the GCS bucket.
+        remote_filename (str): Path to the remote file within the GCS bucket.
+    """
+    upload_obj(repo_config, bucket_name, remote_filename, RepoConfigSerializer())
+
+def fetch_repo_config(
+    bucket_name: str,
+    remote_filename: str
+) -> Any:
+    """
+    Fetch a Feast RepoConfig from GCS. Configs stored as pickles by older
+    versions of this repo are still read: if a JSON config does not exist,
+    the pickle next to it (same path, .pkl extension) is fetched instead.
+
+    Args:
+        bucket_name (str): Name of the GCS bucket.
+        remote_filename (str): Path to the remote file within the GCS bucket.
+
+    Returns:
+        RepoConfig: Feast repo config.
+    """
+    if remote_filename.endswith(".pkl"):
+        return fetch_pkl(bucket_name, remote_filename)
+    try:
+        return fetch_obj(bucket_name, remote_filename, RepoConfigSerializer())
+    except NotFound:
+        legacy_filename = f"{os.path.splitext(remote_filename)[0]}.pkl"
+        return fetch_pkl(bucket_name, legacy_filename)
 
 
 def download_file_url(
@@ -71,3 +71,31 @@ class TritonGCSModelRepo:
         logging.info(f"Saved model version {version}.")
         self._refresh()
         return version
+
+    def fetch_version(self, version: int, local_path: str) -> str:
+        """
+        Download a model version from GCS.
+
+        Args:
+            version (int): Model version number to fetch.
+            local_path (str): Local file to download the model to.
+
+        Returns:
+            str: Path to the downloaded model file.
+        """
+        path = f"{self._version_path(version)}/{self.model_filename}"
+        self.bucket.blob(path).download_to_filename(local_path)
+        logging.info(f"Fetched model version {version}.")
+        return local_path
+
+    def fetch_latest(self, local_path: str) -> str:
+        """
+        Download the latest model version from GCS.
+
+        Args:
+            local_path (str): Local file to download the model to.
+
+        Returns:
+            str: Path to the downloaded model file.
+        """
+        return self.fetch_version(self.latest_version, local_path)
@@ -0,0 +1,4 @@
+import os
+
+# feature_store.repo.config requires a GCP project at import time
+os.environ.setdefault("PROJECT_ID", "test-project")
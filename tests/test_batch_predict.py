@@ -0,0 +1,81 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("google.cloud.bigquery")
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("redis")
+
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "docker", "setup"))
+import batch_predict
+
+
+class FakePipeline:
+
+    def __init__(self):
+        self.commands = []
+        self.executed = False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.executed = True
+
+
+def test_predict_with_a_booster():
+    booster = MagicMock(spec=["inplace_predict"])
+    booster.inplace_predict.return_value = np.array([1.0])
+
+    assert batch_predict.predict(booster, np.zeros((1, 2))) == [1.0]
+
+
+def test_predict_with_a_scikit_learn_model():
+    model = MagicMock(spec=["get_booster", "inplace_predict", "predict"])
+    model.predict.return_value = np.array([2.0])
+
+    assert batch_predict.predict(model, np.zeros((1, 2))) == [2.0]
+    model.inplace_predict.assert_not_called()
+
+
+def test_save_predictions_replaces_predictions_in_one_transaction():
+    redis_client = MagicMock()
+    pipe = redis_client.pipeline.return_value = FakePipeline()
+
+    batch_predict.save_predictions(redis_client, ["CA", "NY"], np.array([1.5, 2.5]), 3)
+
+    redis_client.pipeline.assert_called_once_with(transaction=True)
+    key = f"{batch_predict.config.PREDICTIONS_PREFIX}:{batch_predict.config.MODEL_NAME}"
+    names = [name for name, _, _ in pipe.commands]
+    assert names == ["delete", "hset", "hset"]
+    assert pipe.commands[0][1] == (key,)
+    assert pipe.commands[1][2]["mapping"] == {"CA": 1.5, "NY": 2.5}
+    assert pipe.commands[2][2]["mapping"]["model_version"] == 3
+    assert pipe.executed
+
+
+def test_save_predictions_keeps_previous_predictions_without_any():
+    redis_client = MagicMock()
+
+    batch_predict.save_predictions(redis_client, [], np.array([]), 3)
+
+    redis_client.pipeline.assert_not_called()
+
+
+def test_batch_predict_stops_without_states(monkeypatch):
+    monkeypatch.setattr(batch_predict.storage, "get_feature_store", MagicMock())
+    monkeypatch.setattr(batch_predict, "DataFetcher", MagicMock())
+    monkeypatch.setattr(batch_predict.bigquery, "Client", MagicMock())
+    monkeypatch.setattr(batch_predict.features, "fetch_states", MagicMock(return_value=[]))
+    load_model = MagicMock()
+    monkeypatch.setattr(batch_predict, "load_model", load_model)
+
+    batch_predict.batch_predict(MagicMock())
+
+    load_model.assert_not_called()
+    batch_predict.DataFetcher.return_value.get_online_vectors.assert_not_called()
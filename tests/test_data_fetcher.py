@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+import pytest
+
+feast = pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("redis")
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from feast.types import Float32
+from feature_store.utils import DataFetcher
+from feature_store.utils import snapshot
+from feature_store.utils.cache import FeatureCache
+from feature_store.utils.resilience import FeatureFetchError
+from feature_store.utils.shared_snapshot import SharedSnapshot, SharedSnapshotRefresher
+
+
+PROJECT = "test_project"
+FEATURES = ["lag_1_vaccine_interest", "lag_2_vaccine_interest"]
+
+
+class StubRegistry:
+    """
+    Registry lookups with the same getters as RegistryCache.
+    """
+
+    def __init__(self, feature_services=("serving_features", "training_features")):
+        state = feast.Entity(name="state", join_keys=["state"])
+        feature_view = feast.FeatureView(
+            name="vaccine_search_trends",
+            entities=[state],
+            ttl=timedelta(days=1),
+            schema=[feast.Field(name=name, dtype=Float32) for name in FEATURES],
+            source=feast.FileSource(path="features.parquet", timestamp_field="date")
+        )
+        self.entities = {state.name: state}
+        self.feature_views = {feature_view.name: feature_view}
+        self.feature_services = {
+            name: feast.FeatureService(name=name, features=[feature_view])
+            for name in feature_services
+        }
+
+    def get_feature_service(self, name):
+        return self.feature_services[name]
+
+    def get_feature_view(self, name):
+        return self.feature_views[name]
+
+    def get_entity(self, name):
+        return self.entities[name]
+
+
+class FakeRedis:
+
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def mget(self, keys):
+        if self.down:
+            raise ConnectionError("Redis is down")
+        if not keys:
+            raise ValueError("wrong number of arguments for 'mget' command")
+        return [self.values.get(key) for key in keys]
+
+    def smembers(self, key):
+        return self.values.get(key, set())
+
+    def hget(self, key, field):
+        return self.values.get(key, {}).get(field)
+
+
+@pytest.fixture
+def redis():
+    redis = FakeRedis()
+    for state, vector in (("CA", [1.0, 2.0]), ("NY", [3.0, 4.0])):
+        key = snapshot.snapshot_key(PROJECT, "serving_features", state)
+        redis.values[key] = np.asarray(vector, dtype=snapshot.SNAPSHOT_DTYPE).tobytes()
+    return redis
+
+
+@pytest.fixture
+def fs(redis):
+    fs = MagicMock()
+    fs.project = PROJECT
+    fs._get_provider.return_value.online_store._get_client.return_value = redis
+    return fs
+
+
+def redis_down(fs, redis):
+    redis.down = True
+    fs.get_online_features.side_effect = ConnectionError("Redis is down")
+
+
+def test_snapshot_vectors_are_served_from_cache_when_redis_is_down(fs, redis):
+    data_fetcher = DataFetcher(
+        fs,
+        cache=FeatureCache(ttl=60, max_size=100),
+        registry_cache=StubRegistry()
+    )
+    entity_rows = [{"state": "CA"}, {"state": "NY"}]
+    expected = data_fetcher.get_snapshot_vectors(entity_rows)
+
+    redis_down(fs, redis)
+    np.testing.assert_array_equal(data_fetcher.get_snapshot_vectors(entity_rows), expected)
+
+
+def test_stale_snapshot_vectors_are_served_when_redis_is_down(fs, redis):
+    data_fetcher = DataFetcher(
+        fs,
+        cache=FeatureCache(ttl=0.001, max_size=100),
+        registry_cache=StubRegistry()
+    )
+    entity_rows = [{"state": "CA"}, {"state": "NY"}]
+    expected = data_fetcher.get_snapshot_vectors(entity_rows)
+    time.sleep(0.01)
+
+    redis_down(fs, redis)
+    np.testing.assert_array_equal(data_fetcher.get_snapshot_vectors(entity_rows), expected)
+    fs.get_online_features.assert_called_once()
+
+
+def test_unseen_entities_fail_when_redis_is_down(fs, redis):
+    data_fetcher = DataFetcher(
+        fs,
+        cache=FeatureCache(ttl=60, max_size=100),
+        registry_cache=StubRegistry()
+    )
+    data_fetcher.get_snapshot_vectors([{"state": "CA"}])
+
+    redis_down(fs, redis)
+    with pytest.raises(FeatureFetchError) as error:
+        data_fetcher.get_snapshot_vectors([{"state": "CA"}, {"state": "NY"}])
+    assert error.value.failed == [1]
+    np.testing.assert_array_equal(error.value.vectors[0], [1.0, 2.0])
+
+
+def test_build_entity_query_is_unchanged_without_dates():
+    entity_query = "SELECT state, date AS event_timestamp FROM features"
+    assert DataFetcher.build_entity_query(entity_query) == entity_query
+
+
+def test_build_entity_query_bounds_event_timestamps():
+    entity_query = "SELECT state, date AS event_timestamp FROM features"
+    sql = DataFetcher.build_entity_query(
+        entity_query,
+        start_date=datetime(2021, 1, 1),
+        end_date=datetime(2021, 6, 30)
+    )
+    assert f"({entity_query})" in sql
+    assert "event_timestamp >= TIMESTAMP('2021-01-01T00:00:00')" in sql
+    assert "event_timestamp <= TIMESTAMP('2021-06-30T00:00:00')" in sql
+
+
+def test_get_training_data_queries_time_bounded_entities(fs):
+    data_fetcher = DataFetcher(fs, registry_cache=StubRegistry())
+    entity_query = "SELECT state, date AS event_timestamp FROM features"
+    start_date = datetime(2021, 1, 1)
+
+    data_fetcher.get_training_data(entity_query=entity_query, start_date=start_date)
+
+    _, kwargs = fs.get_historical_features.call_args
+    assert kwargs["entity_df"] == DataFetcher.build_entity_query(entity_query, start_date)
+    assert kwargs["features"] is data_fetcher.training_feature_svc
+
+
+def test_snapshot_vectors_of_another_width_are_misses(fs, redis):
+    key = snapshot.snapshot_key(PROJECT, "serving_features", "NY")
+    redis.values[key] = np.asarray([3.0], dtype=snapshot.SNAPSHOT_DTYPE).tobytes()
+    fs.get_online_features.return_value.to_dict.return_value = {
+        "lag_1_vaccine_interest": [5.0],
+        "lag_2_vaccine_interest": [6.0]
+    }
+    data_fetcher = DataFetcher(fs, registry_cache=StubRegistry())
+
+    vectors = data_fetcher.get_snapshot_vectors([{"state": "CA"}, {"state": "NY"}])
+
+    np.testing.assert_array_equal(vectors, [[1.0, 2.0], [5.0, 6.0]])
+    _, kwargs = fs.get_online_features.call_args
+    assert kwargs["entity_rows"] == [{"state": "NY"}]
+
+
+def test_empty_snapshot_is_not_published(fs, redis, tmp_path):
+    path = str(tmp_path / "features.snapshot")
+    redis.values[snapshot.meta_key(PROJECT, "serving_features")] = {
+        "updated_at": b"2021-01-01T00:00:00"
+    }
+    data_fetcher = DataFetcher(fs, registry_cache=StubRegistry())
+    refresher = SharedSnapshotRefresher(
+        path,
+        version=data_fetcher.get_snapshot_version,
+        load=data_fetcher.read_snapshot,
+        interval=60
+    )
+
+    ids, vectors = data_fetcher.read_snapshot()
+    assert ids == []
+    assert vectors.shape == (0, 2)
+    assert not refresher.refresh()
+
+
+def test_missing_shared_snapshot_falls_back_to_redis(fs, redis, tmp_path):
+    data_fetcher = DataFetcher(fs, registry_cache=StubRegistry())
+    data_fetcher.set_shared_snapshot(
+        "serving_features",
+        SharedSnapshot(str(tmp_path / "features.snapshot"))
+    )
+
+    vectors = data_fetcher.get_snapshot_vectors([{"state": "CA"}, {"state": "NY"}])
+
+    np.testing.assert_array_equal(vectors, [[1.0, 2.0], [3.0, 4.0]])
+
+
+def test_only_the_passed_feature_services_are_resolved(fs, redis):
+    key = snapshot.snapshot_key(PROJECT, "vaccine_features", "CA")
+    redis.values[key] = np.asarray([5.0, 6.0], dtype=snapshot.SNAPSHOT_DTYPE).tobytes()
+    data_fetcher = DataFetcher(
+        fs,
+        feature_services=["vaccine_features"],
+        registry_cache=StubRegistry(feature_services=["vaccine_features"])
+    )
+
+    vectors = data_fetcher.get_snapshot_vectors([{"state": "CA"}], "vaccine_features")
+
+    np.testing.assert_array_equal(vectors, [[5.0, 6.0]])
+    assert "serving_features" not in data_fetcher.registry
+    with pytest.raises(KeyError):
+        data_fetcher.serving_layout
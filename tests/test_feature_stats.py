@@ -0,0 +1,179 @@
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("redis")
+
+from datetime import datetime
+from feature_store.utils.feature_registry import FeatureLayout
+from feature_store.utils.feature_stats import (
+    FeatureStats,
+    FeatureStatsStore,
+    QuantileSketch,
+    RunningStats
+)
+
+
+class FakeRedis:
+    """
+    The subset of Redis used by FeatureStatsStore, with pipelines that run
+    their commands on execute.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def set(self, key, value):
+        self.data[key] = value.encode("utf-8")
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({
+            field.encode("utf-8"): value.encode("utf-8")
+            for field, value in mapping.items()
+        })
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(field.encode("utf-8"))
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def zrange(self, key, start, end):
+        scores = self.data.get(key, {})
+        return [member.encode("utf-8") for member in sorted(scores, key=scores.get)]
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append(lambda: getattr(self.redis, name)(*args, **kwargs))
+        return command
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def store():
+    layout = FeatureLayout("serving_features", ["a", "b"], {})
+    return FeatureStatsStore(FakeRedis(), "test_project", layout)
+
+
+def test_running_stats_match_numpy():
+    values = np.random.default_rng(0).normal(10, 3, size=1000)
+    stats = RunningStats().update(values[:300]).update(values[300:])
+
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(np.var(values, ddof=1))
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_running_stats_merge_partial_results():
+    values = np.random.default_rng(1).exponential(size=500)
+    merged = RunningStats().update(values[:100]).merge(RunningStats().update(values[100:]))
+
+    assert merged.variance == pytest.approx(np.var(values, ddof=1))
+
+
+@pytest.mark.parametrize("q", [0.01, 0.1, 0.5, 0.9, 0.99])
+def test_quantile_sketch_relative_error(q):
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.lognormal(size=5000), -rng.lognormal(size=1000), np.zeros(100)])
+    sketch = QuantileSketch(relative_accuracy=0.01).update(values)
+
+    expected = np.quantile(values, q, method="lower")
+    assert abs(sketch.quantile(q) - expected) <= 0.01 * abs(expected)
+
+
+def test_quantile_sketch_collapse_bounds_bins():
+    values = np.logspace(-5, 5, 10000)
+    sketch = QuantileSketch(relative_accuracy=0.01, max_bins=32).update(values)
+
+    assert len(sketch.positive) == 32
+    assert sketch.count == 10000
+    # Only the smallest values are folded together
+    expected = np.quantile(values, 0.99, method="lower")
+    assert abs(sketch.quantile(0.99) - expected) <= 0.01 * expected
+
+
+def test_quantile_sketch_merge_matches_a_single_sketch():
+    values = np.random.default_rng(3).normal(size=1000)
+    merged = QuantileSketch().update(values[:400]).merge(QuantileSketch().update(values[400:]))
+    single = QuantileSketch().update(values)
+
+    assert merged.to_dict() == single.to_dict()
+
+
+def test_feature_stats_round_trip():
+    values = np.random.default_rng(4).normal(size=200)
+    stats = FeatureStats().update(values)
+    loaded = FeatureStats.loads(stats.dumps())
+
+    assert loaded.moments.to_dict() == stats.moments.to_dict()
+    assert loaded.sketch.to_dict() == stats.sketch.to_dict()
+    assert loaded.sketch.quantile(0.5) == stats.sketch.quantile(0.5)
+
+
+def test_all_nan_values():
+    stats = FeatureStats().update(np.full(10, np.nan))
+    loaded = FeatureStats.loads(stats.dumps())
+
+    assert loaded.moments.count == 0
+    assert loaded.moments.variance == 0.0
+    assert loaded.moments.to_dict()["min"] is None
+    assert loaded.sketch.quantile(0.5) is None
+    assert loaded.merge(FeatureStats().update(np.ones(3))).moments.min == 1.0
+
+
+def test_write_skips_unchanged_snapshots(store):
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+    assert store.write("2021-01-01", vectors, datetime(2021, 1, 1)) is not None
+    assert store.write("2021-01-02", vectors, datetime(2021, 1, 2)) is None
+    assert store.windows() == ["2021-01-01"]
+
+    last_run = store.freshness()
+    assert last_run["materialized_at"] == datetime(2021, 1, 2).isoformat()
+    assert last_run["window"] == "2021-01-01"
+    assert store.freshness("2021-01-01")["materialized_at"] == datetime(2021, 1, 1).isoformat()
+
+    assert store.write("2021-01-03", vectors + 1, datetime(2021, 1, 3)) is not None
+    assert store.windows() == ["2021-01-01", "2021-01-03"]
+    assert store.freshness()["window"] == "2021-01-03"
+
+
+def test_compare_merged_periods(store):
+    for day, offset in ((1, 0), (2, 1), (3, 10), (4, 11)):
+        vectors = np.arange(6, dtype=np.float32).reshape(3, 2) + offset
+        store.write(f"2021-01-0{day}", vectors, datetime(2021, 1, day))
+
+    period = store.read_range("2021-01-01", "2021-01-02")
+    assert period["a"].moments.count == 6
+    assert period["a"].moments.mean == pytest.approx(2.5)
+
+    drift = store.compare(("2021-01-01", "2021-01-02"), ("2021-01-03", None))
+    assert drift["a"]["mean"] == pytest.approx((2.5, 12.5))
+    assert drift["a"]["count"] == (6, 6)
+    assert not math.isnan(drift["b"]["standardized_mean_difference"])
@@ -0,0 +1,80 @@
+import pytest
+
+bigquery = pytest.importorskip("google.cloud.bigquery")
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("redis")
+
+from unittest.mock import MagicMock
+from google.api_core.exceptions import NotFound
+from feature_store.repo import features
+
+
+TABLE_ID = "test-project.gcp_feast_demo.vaccine_search_trends"
+
+
+def assert_partitioned(job_config):
+    assert job_config.time_partitioning.type_ == bigquery.TimePartitioningType.DAY
+    assert job_config.time_partitioning.field == "date"
+    assert job_config.clustering_fields == ["state"]
+    assert job_config.write_disposition == bigquery.WriteDisposition.WRITE_TRUNCATE
+
+
+def test_vaccine_search_trends_job_config():
+    job_config = features.vaccine_search_trends_job_config(TABLE_ID)
+    assert_partitioned(job_config)
+    assert job_config.destination.table_id == "vaccine_search_trends"
+
+
+@pytest.mark.parametrize("source_format, skip_leading_rows", [
+    (bigquery.SourceFormat.CSV, 1),
+    (bigquery.SourceFormat.PARQUET, None)
+])
+def test_vaccine_counts_job_config(source_format, skip_leading_rows):
+    job_config = features.vaccine_counts_job_config(source_format)
+    assert_partitioned(job_config)
+    assert job_config.source_format == source_format
+    assert job_config.skip_leading_rows == skip_leading_rows
+    assert [field.name for field in job_config.schema] == [
+        "date",
+        "state",
+        "lag_1_weekly_vaccinations_count",
+        "weekly_vaccinations_count",
+        "lag_2_weekly_vaccinations_count"
+    ]
+
+
+def test_generate_vaccine_search_trends_writes_partitioned_table():
+    client = MagicMock()
+    client.get_table.side_effect = NotFound("missing")
+
+    features.generate_vaccine_search_trends(MagicMock(), client, TABLE_ID)
+
+    (sql,), kwargs = client.query.call_args
+    assert sql == features.vaccine_search_trends_sql()
+    assert_partitioned(kwargs["job_config"])
+    client.delete_table.assert_not_called()
+
+
+def test_ensure_partitioned_replaces_unpartitioned_table_in_place():
+    client = MagicMock()
+    client.get_table.return_value.time_partitioning = None
+
+    features.ensure_partitioned(MagicMock(), client, TABLE_ID)
+
+    (sql,), _ = client.query.call_args
+    assert f"CREATE OR REPLACE TABLE `{TABLE_ID}`" in sql
+    assert "PARTITION BY DATE(date)" in sql
+    assert "CLUSTER BY state" in sql
+    assert f"AS SELECT * FROM `{TABLE_ID}`" in sql
+    client.delete_table.assert_not_called()
+
+
+def test_ensure_partitioned_keeps_partitioned_table():
+    client = MagicMock()
+    client.get_table.return_value.time_partitioning = features.time_partitioning()
+    client.get_table.return_value.clustering_fields = ["state"]
+
+    features.ensure_partitioned(MagicMock(), client, TABLE_ID)
+
+    client.query.assert_not_called()
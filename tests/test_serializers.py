@@ -0,0 +1,164 @@
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("redis")
+
+from google.api_core.exceptions import NotFound
+from feature_store.utils import redis_model_repo, storage
+from feature_store.utils.serializers import (
+    PickleSerializer,
+    RepoConfigSerializer,
+    Serializer
+)
+
+
+class FakeBlob:
+
+    def __init__(self, data):
+        self.data = data
+
+    def download_as_bytes(self):
+        if self.data is None:
+            raise NotFound("No such object")
+        return self.data
+
+
+class FakeRedis:
+    """
+    Hashes of a Redis database, with pipelines that run their commands on
+    execute.
+    """
+
+    def __init__(self, **kwargs):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hlen(self, name):
+        return len(self.hashes.get(name, {}))
+
+    def hset(self, name, key, value):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self.hashes.setdefault(name, {})[key.encode("utf-8")] = value
+        return 1
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key.encode("utf-8"))
+
+    def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append(lambda: getattr(self.redis, name)(*args, **kwargs))
+        return command
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+def test_serializer_is_abstract():
+    with pytest.raises(TypeError):
+        Serializer()
+
+
+def test_pickle_serializer_round_trip():
+    obj = {"weights": np.arange(1000, dtype=np.float32), "name": "model"}
+    data = PickleSerializer().dumps(obj)
+
+    assert data.startswith(PickleSerializer.magic)
+    loaded = PickleSerializer().loads(data)
+    np.testing.assert_array_equal(loaded["weights"], obj["weights"])
+    assert loaded["name"] == "model"
+
+
+def test_pickle_serializer_loads_writable_arrays():
+    data = PickleSerializer().dumps(np.zeros(10))
+
+    for payload in (data, bytearray(data)):
+        array = PickleSerializer().loads(payload)
+        array[0] = 1.0
+        assert array.flags.writeable
+
+
+def test_pickle_serializer_loads_plain_pickles():
+    obj = {"weights": np.arange(3), "name": "model"}
+
+    loaded = PickleSerializer().loads(pickle.dumps(obj, protocol=4))
+
+    np.testing.assert_array_equal(loaded["weights"], obj["weights"])
+    assert loaded["name"] == "model"
+
+
+def test_repo_config_round_trip():
+    pytest.importorskip("feast.infra.online_stores.redis")
+    from feast import RepoConfig
+
+    repo_config = RepoConfig(
+        project="test_project",
+        registry="gs://bucket/data/registry.db",
+        provider="gcp",
+        online_store={"type": "redis", "connection_string": "localhost:6379,password=secret"},
+        offline_store={"type": "bigquery", "dataset": "features"},
+        repo_path="/tmp/repo"
+    )
+
+    loaded = RepoConfigSerializer().loads(RepoConfigSerializer().dumps(repo_config))
+
+    assert loaded.project == "test_project"
+    assert loaded.registry == repo_config.registry
+    assert loaded.online_store.type == "redis"
+    assert loaded.online_store.connection_string == "localhost:6379,password=secret"
+    assert loaded.offline_store.type == "bigquery"
+    assert loaded.offline_store.dataset == "features"
+    assert loaded.repo_path is None
+
+
+def test_fetch_repo_config_falls_back_to_the_pickle(monkeypatch):
+    blobs = {
+        "data/repo_config.json": FakeBlob(None),
+        "data/repo_config.pkl": FakeBlob(pickle.dumps({"project": "test_project"}))
+    }
+    monkeypatch.setattr(
+        storage,
+        "get_blob",
+        lambda remote_filename, bucket_name: blobs[remote_filename]
+    )
+
+    repo_config = storage.fetch_repo_config("bucket", "data/repo_config.json")
+
+    assert repo_config == {"project": "test_project"}
+
+
+def test_fetch_repo_config_raises_without_any_config(monkeypatch):
+    monkeypatch.setattr(storage, "get_blob", lambda remote_filename, bucket_name: FakeBlob(None))
+
+    with pytest.raises(NotFound):
+        storage.fetch_repo_config("bucket", "data/repo_config.json")
+
+
+def test_model_versions_without_a_format_are_pickles(monkeypatch):
+    monkeypatch.setattr(redis_model_repo.redis, "Redis", FakeRedis)
+    model_repo = redis_model_repo.RedisModelRepo("localhost", "6379", "", "test_model")
+    # Saved before formats were recorded
+    model_repo.redis_client.hset(model_repo.model_versions(), "1", pickle.dumps({"version": 1}))
+    model_repo.latest_version = 1
+
+    assert model_repo.save_version({"version": 2}) == 2
+    assert model_repo.fetch_version(1) == {"version": 1}
+    assert model_repo.fetch_latest() == {"version": 2}
+    assert model_repo.fetch_all_versions() == {b"1": {"version": 1}, b"2": {"version": 2}}
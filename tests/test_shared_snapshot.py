@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("redis")
+
+from feature_store.utils.shared_snapshot import (
+    SharedSnapshot,
+    SharedSnapshotRefresher,
+    write_shared_snapshot
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "features.snapshot")
+
+
+def test_write_and_lookup(path):
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+    write_shared_snapshot(path, ["CA", "NY", "TX"], vectors)
+
+    shared_snapshot = SharedSnapshot(path)
+    out, missing = shared_snapshot.lookup(["TX", "XX", "CA"])
+
+    np.testing.assert_array_equal(out[[0, 2]], vectors[[2, 0]])
+    assert missing == [1]
+    assert not shared_snapshot.vectors.flags.writeable
+
+
+def test_lookup_before_the_snapshot_exists(path):
+    out, missing = SharedSnapshot(path).lookup(["CA", "NY"])
+
+    assert out.shape[0] == 2
+    assert missing == [0, 1]
+
+
+def test_lookup_in_an_empty_snapshot(path):
+    write_shared_snapshot(path, [], np.empty((0, 2), dtype=np.float32))
+
+    out, missing = SharedSnapshot(path).lookup(["CA", "NY"])
+
+    assert out.shape == (2, 2)
+    assert missing == [0, 1]
+
+
+def test_remap_after_the_file_is_replaced(path):
+    write_shared_snapshot(path, ["CA"], np.ones((1, 2), dtype=np.float32))
+    shared_snapshot = SharedSnapshot(path, check_interval=0)
+    old_vectors = shared_snapshot.vectors
+
+    write_shared_snapshot(path, ["CA", "NY"], np.full((2, 2), 2, dtype=np.float32))
+    out, missing = shared_snapshot.lookup(["CA", "NY"])
+
+    np.testing.assert_array_equal(out, np.full((2, 2), 2))
+    assert missing == []
+    # Arrays handed out before the remap keep the old mapping alive
+    np.testing.assert_array_equal(old_vectors, np.ones((1, 2)))
+
+
+def test_refresher_only_reloads_new_versions(path):
+    version = ["2021-01-01T00:00:00"]
+    loads = []
+
+    def load():
+        loads.append(version[0])
+        return ["CA"], np.ones((1, 2), dtype=np.float32)
+
+    refresher = SharedSnapshotRefresher(path, lambda: version[0], load, interval=60)
+
+    assert refresher.refresh()
+    assert not refresher.refresh()
+    version[0] = "2021-01-08T00:00:00"
+    assert refresher.refresh()
+    assert loads == ["2021-01-01T00:00:00", "2021-01-08T00:00:00"]
+
+
+@pytest.mark.parametrize("version, ids", [
+    (None, ["CA"]),
+    ("2021-01-01T00:00:00", [])
+])
+def test_refresher_does_not_publish_a_missing_snapshot(path, version, ids):
+    refresher = SharedSnapshotRefresher(
+        path,
+        lambda: version,
+        lambda: (ids, np.ones((len(ids), 2), dtype=np.float32)),
+        interval=60
+    )
+
+    assert not refresher.refresh()
+    assert not os.path.exists(path)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("feast")
+pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.storage")
+pytest.importorskip("redis")
+
+from feature_store.utils import snapshot
+from feature_store.utils.feature_registry import FeatureLayout
+
+
+PROJECT = "test_project"
+
+
+class FakeRedis:
+    """
+    Keys and sets of a Redis database, with pipelines that run their
+    commands on execute.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def mset(self, mapping):
+        self.values.update(mapping)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def sadd(self, key, *members):
+        self.values.setdefault(key, set()).update(member.encode("utf-8") for member in members)
+
+    def smembers(self, key):
+        return set(self.values.get(key, set()))
+
+    def hset(self, key, mapping):
+        self.values.setdefault(key, {}).update(mapping)
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append(lambda: getattr(self.redis, name)(*args, **kwargs))
+        return command
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def layout():
+    return FeatureLayout("serving_features", ["a", "b"], {}, join_keys=["state"])
+
+
+def write(redis, layout, states):
+    vectors = np.ones((len(states), layout.width), dtype=np.float32)
+    snapshot.write_snapshot(redis, PROJECT, layout, [{"state": state} for state in states], vectors)
+
+
+def test_write_snapshot_deletes_vectors_of_dropped_entities(layout):
+    redis = FakeRedis()
+    write(redis, layout, ["CA", "NY", "TX"])
+    write(redis, layout, ["CA", "WA"])
+
+    assert snapshot.read_entities(redis, PROJECT, layout) == [{"state": "CA"}, {"state": "WA"}]
+    vector_keys = {key for key in redis.values if key.endswith(("CA", "NY", "TX", "WA"))}
+    assert vector_keys == {
+        snapshot.snapshot_key(PROJECT, "serving_features", state) for state in ("CA", "WA")
+    }
+
+
+def test_write_an_empty_snapshot(layout):
+    redis = FakeRedis()
+    write(redis, layout, ["CA"])
+    write(redis, layout, [])
+
+    assert snapshot.read_entities(redis, PROJECT, layout) == []
+    assert snapshot.snapshot_key(PROJECT, "serving_features", "CA") not in redis.values